@@ -0,0 +1,238 @@
+"""
+Synthetic analytics generator
+Bulk-loads realistic analytics_events so stats, retention and export can be
+measured at production-like scale (1M, 10M, 50M events).
+
+Visitors come back across the date span, browse in short sessions with a
+daily traffic curve, and a share of the traffic comes from crawlers. Device,
+browser and OS are derived from the user agent with the same parsers the
+/api/analytics/track endpoint uses. The same seed and arguments always
+produce the same events.
+
+Run from the backend directory:
+    python -m benchmarks.analytics_data --events 1000000 --db-name portfolio_scale_1m
+    python -m benchmarks.analytics_data --events 10000000 --days 365 --ips 200000 --bot-share 0.3
+"""
+import argparse
+import asyncio
+import ipaddress
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import database
+from routes.analytics import parse_user_agent, parse_browser, parse_os, get_location_from_ip
+
+DEFAULT_PAGES = "/=40,/projects=20,/experience=12,/skills=10,/certifications=8,/education=5,/contact=5"
+DEFAULT_UA_MIX = "desktop=0.55,mobile=0.4,tablet=0.05"
+
+USER_AGENTS = {
+    "desktop": [
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+    ],
+    "mobile": [
+        "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Mobile/15E148 Safari/604.1",
+        "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36",
+        "Mozilla/5.0 (Linux; Android 13; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Mobile Safari/537.36",
+    ],
+    "tablet": [
+        "Mozilla/5.0 (iPad; CPU OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+        "Mozilla/5.0 (Linux; Android 13; Tablet SM-X710) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    ],
+}
+
+BOT_USER_AGENTS = [
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "Mozilla/5.0 (compatible; bingbot/2.0; +http://www.bing.com/bingbot.htm)",
+    "Mozilla/5.0 (compatible; AhrefsBot/7.0; +http://ahrefs.com/robot/)",
+    "python-requests/2.31.0",
+    "curl/8.4.0",
+]
+BOT_IPS = 64
+
+# Relative traffic per hour of day (UTC), quiet at night and peaking in the afternoon
+HOUR_WEIGHTS = [2, 1, 1, 1, 1, 2, 3, 5, 7, 8, 9, 9, 9, 10, 10, 10, 9, 8, 7, 6, 5, 4, 3, 2]
+
+
+def parse_weights(spec: str) -> dict:
+    """Parse "a=1,b=2" into {"a": 1.0, "b": 2.0}"""
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.strip().rpartition("=")
+        if not name:
+            raise argparse.ArgumentTypeError(f"expected name=weight, got {part!r}")
+        weights[name] = float(weight)
+    return weights
+
+
+def visitor_ip(index: int) -> str:
+    """Spread visitor numbers over the IPv4 space"""
+    return str(ipaddress.IPv4Address(index * 2654435761 % 2**32))
+
+
+class EventGenerator:
+    """Produces analytics_events documents session by session"""
+
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        self.start = args.end - timedelta(days=args.days)
+        self.days = args.days
+        self.ips = args.ips
+        self.bot_share = args.bot_share
+        self.click_share = args.click_share
+        self.session_events = args.session_events
+
+        pages = parse_weights(args.pages)
+        self.pages = list(pages)
+        self.page_weights = list(pages.values())
+        ua_mix = parse_weights(args.ua_mix)
+        self.devices = [device for device in ua_mix if device in USER_AGENTS]
+        self.device_weights = [ua_mix[device] for device in self.devices]
+
+        # Parse each user agent once with the tracking endpoint's parsers
+        self.ua_fields = {
+            ua: {"device_type": parse_user_agent(ua), "browser": parse_browser(ua), "os": parse_os(ua)}
+            for ua in [*BOT_USER_AGENTS, *(ua for group in USER_AGENTS.values() for ua in group)]
+        }
+        self.location_cache = {}
+        self.visitor_agents = {}
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _location(self, ip: str) -> str:
+        location = self.location_cache.get(ip)
+        if location is None:
+            location = self.location_cache[ip] = get_location_from_ip(ip)
+        return location
+
+    def _session_start(self) -> datetime:
+        day = self.rng.randrange(self.days)
+        hour = self.rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+        return self.start + timedelta(days=day, hours=hour, seconds=self.rng.randrange(3600))
+
+    def session(self) -> list:
+        """One visit: a burst of page views and clicks from a single visitor"""
+        rng = self.rng
+        is_bot = rng.random() < self.bot_share
+        if is_bot:
+            visitor = rng.randrange(BOT_IPS)
+            ip = visitor_ip(self.ips + visitor)
+            user_agent = BOT_USER_AGENTS[visitor % len(BOT_USER_AGENTS)]
+            length = max(1, int(rng.expovariate(1 / (self.session_events * 3))))
+        else:
+            # Skewed so a minority of visitors return often
+            visitor = int(self.ips * rng.random() ** 2)
+            ip = visitor_ip(visitor)
+            # Each visitor keeps the device and browser of their first visit
+            user_agent = self.visitor_agents.get(visitor)
+            if user_agent is None:
+                device = rng.choices(self.devices, weights=self.device_weights)[0]
+                user_agent = self.visitor_agents[visitor] = rng.choice(USER_AGENTS[device])
+            length = max(1, int(rng.expovariate(1 / self.session_events)))
+
+        fields = self.ua_fields[user_agent]
+        location = self._location(ip)
+        session_id = self._uuid()
+        timestamp = self._session_start()
+        events = []
+        for _ in range(length):
+            clicked = not is_bot and rng.random() < self.click_share
+            events.append({
+                "id": self._uuid(),
+                "event_type": "click" if clicked else "page_view",
+                "page": rng.choices(self.pages, weights=self.page_weights)[0],
+                "ip_address": ip,
+                "user_agent": user_agent,
+                "device_type": fields["device_type"],
+                "browser": fields["browser"],
+                "os": fields["os"],
+                "location": location,
+                "timestamp": timestamp,
+                "session_id": session_id,
+            })
+            timestamp += timedelta(seconds=rng.randint(1, 10) if is_bot else rng.randint(5, 90))
+        return events
+
+    def batches(self, total: int, batch_size: int):
+        """Yield lists of at most batch_size events until total have been produced"""
+        batch = []
+        produced = 0
+        while produced < total:
+            for event in self.session()[:total - produced]:
+                batch.append(event)
+                produced += 1
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+
+async def load(args):
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    db = database.connect()
+    collection = db.analytics_events
+
+    if args.drop:
+        await collection.drop()
+    elif await collection.estimated_document_count():
+        sys.exit(f"{args.db_name}.analytics_events is not empty; pass --drop to replace it")
+
+    generator = EventGenerator(args)
+    started = time.perf_counter()
+    inserted = 0
+    pending = None
+    for batch in generator.batches(args.events, args.batch_size):
+        # Build the next batch while the previous one is being written
+        if pending is not None:
+            inserted += len((await pending).inserted_ids)
+        pending = asyncio.ensure_future(collection.insert_many(batch, ordered=False))
+        if inserted and inserted % (args.batch_size * 50) == 0:
+            rate = inserted / (time.perf_counter() - started)
+            print(f"{inserted:>12,} events  {rate:>10,.0f}/s")
+    if pending is not None:
+        inserted += len((await pending).inserted_ids)
+
+    elapsed = time.perf_counter() - started
+    print(f"Inserted {inserted:,} events into {args.db_name}.analytics_events in {elapsed:.1f}s "
+          f"({inserted / elapsed:,.0f}/s)")
+    database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=1_000_000, help="events to generate")
+    parser.add_argument("--days", type=int, default=90, help="date span ending at --end")
+    parser.add_argument("--end", type=datetime.fromisoformat,
+                        default=datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0),
+                        help="end of the span, ISO format (defaults to midnight UTC today; fix it to reproduce a dataset exactly)")
+    parser.add_argument("--pages", default=DEFAULT_PAGES, help="page=weight list")
+    parser.add_argument("--ua-mix", default=DEFAULT_UA_MIX, help="device=weight list (desktop, mobile, tablet)")
+    parser.add_argument("--ips", type=int, default=50_000, help="distinct human visitor IPs")
+    parser.add_argument("--bot-share", type=float, default=0.2, help="fraction of sessions from crawlers")
+    parser.add_argument("--click-share", type=float, default=0.2, help="fraction of human events that are clicks")
+    parser.add_argument("--session-events", type=float, default=4.0, help="mean events per human session")
+    parser.add_argument("--seed", type=int, default=1, help="random seed")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="documents per insert_many")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017/"))
+    parser.add_argument("--db-name", default="portfolio_analytics_scale", help="database to fill")
+    parser.add_argument("--drop", action="store_true", help="drop existing analytics_events first")
+    args = parser.parse_args()
+    asyncio.run(load(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+API benchmark
+Drives the ASGI app in-process through httpx's ASGI transport, so results cover
+routing, middleware, handlers, database calls and serialization without any
+network or server process in the way.
+
+The database is either a local mongod (a throwaway database on --mongo-url),
+the embedded SQLite backend in a temporary file (--store sqlite) or, with
+--store memory, mongomock-motor's in-memory stand-in (pip install
+mongomock-motor). Numbers from different stores are not comparable.
+
+Results are written as JSON and compared with a stored baseline; the run exits
+non-zero when any endpoint's p95 latency or throughput regresses by more than
+--tolerance.
+
+Run from the backend directory:
+    python -m benchmarks.api --save-baseline     # record a baseline
+    python -m benchmarks.api                     # compare against it
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = BENCH_DIR / "results" / "api.json"
+DEFAULT_BASELINE = BENCH_DIR / "results" / "api-baseline.json"
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (X11; Linux x86_64; rv:121.0) Gecko/20100101 Firefox/121.0",
+]
+
+# name -> (method, path, request kwargs, needs admin token)
+SCENARIOS = {
+    "analytics_track": ("POST", "/api/analytics/track", {"json": {"event_type": "page_view", "page": "/projects"}}, False),
+    "analytics_stats": ("GET", "/api/analytics/stats", {"params": {"time_range": "30d"}}, False),
+    "content_all": ("GET", "/api/content/all", {}, False),
+    "contact_submit": ("POST", "/api/contact", {"json": {
+        "name": "Bench Visitor", "email": "bench@example.com", "message": "Benchmark message " * 10,
+        "captcha_answer": "7",
+    }}, False),
+    "contact_list": ("GET", "/api/contact/list", {"params": {"limit": 50}}, False),
+    "auth_verify": ("GET", "/api/auth/verify", {}, True),
+}
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def open_database(store: str, mongo_url: str, name: str):
+    """Point the app's shared database at the benchmark store"""
+    import database
+    if store == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--store memory needs mongomock-motor: pip install mongomock-motor")
+        from routes import content
+
+        async def no_transactions(db):
+            # The in-memory stand-in has no server commands to ask
+            return False
+
+        content._supports_transactions = no_transactions
+        return database.use(AsyncMongoMockClient(), name)
+    if store == "sqlite":
+        from sqlite_store import SQLiteClient
+        path = Path(tempfile.mkdtemp(prefix="portfolio-bench-")) / "bench.db"
+        return database.use(SQLiteClient(str(path), name), name)
+    os.environ["MONGO_URL"] = mongo_url
+    os.environ["DB_NAME"] = name
+    return database.connect()
+
+
+async def seed(db, events: int, contacts: int, rng: random.Random):
+    """Fill a fresh database with default content, analytics events and contact messages"""
+    from routes import content
+    from models import AnalyticsEvent, Contact
+
+    for name in await db.list_collection_names():
+        await db.drop_collection(name)
+    await content.load_bundle(db, content.default_bundle())
+
+    now = datetime.utcnow()
+    pages = ["/", "/projects", "/experience", "/certifications", "/contact"]
+    docs = []
+    for i in range(events):
+        event = AnalyticsEvent(
+            event_type="page_view" if rng.random() < 0.8 else "click",
+            page=rng.choice(pages),
+            ip_address=f"198.51.100.{rng.randrange(256)}",
+            user_agent=rng.choice(USER_AGENTS),
+            device_type="desktop",
+            browser="Chrome",
+            os="Windows",
+            location="Unknown",
+        ).model_dump()
+        event["timestamp"] = now - timedelta(seconds=rng.randrange(30 * 86400))
+        docs.append(event)
+    if docs:
+        await db.analytics_events.insert_many(docs)
+
+    docs = [
+        Contact(
+            name=f"Visitor {i}",
+            email=f"visitor{i}@example.com",
+            message="Hello, I would like to talk about a project. " * 5,
+            ip_address="203.0.113.10",
+            user_agent=USER_AGENTS[0],
+        ).model_dump()
+        for i in range(contacts)
+    ]
+    if docs:
+        await db.contacts.insert_many(docs)
+
+
+async def run_scenario(client: httpx.AsyncClient, method: str, path: str, kwargs: dict,
+                       requests: int, concurrency: int, warmup: int) -> dict:
+    """Send requests from `concurrency` workers and summarize their latencies"""
+    for _ in range(warmup):
+        await client.request(method, path, **kwargs)
+
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+async def run(args) -> dict:
+    db = open_database(args.store, args.mongo_url, args.db_name)
+    # Imported once the database is chosen; the lifespan never runs under the ASGI transport
+    from server import app
+    # The app logs every request at INFO, which would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    await seed(db, args.events, args.contacts, random.Random(args.seed))
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/api/auth/login", json={"username": "admin", "password": "password"})
+        token = login.json().get("token")
+        if not token:
+            sys.exit(f"Could not log in as the default admin: {login.text}")
+
+        for name in args.scenarios:
+            method, path, kwargs, needs_auth = SCENARIOS[name]
+            if needs_auth:
+                kwargs = {**kwargs, "headers": {"Authorization": f"Bearer {token}"}}
+            kwargs = {**kwargs, "headers": {"User-Agent": USER_AGENTS[0], **kwargs.get("headers", {})}}
+            results[name] = await run_scenario(client, method, path, kwargs, args.requests, args.concurrency, args.warmup)
+            print(f"{name:<18}{results[name]['throughput_rps']:>10}{results[name]['p50_ms']:>10}"
+                  f"{results[name]['p95_ms']:>10}{results[name]['p99_ms']:>10}{results[name]['errors']:>8}")
+
+    if args.store == "mongo":
+        await db.client.drop_database(args.db_name)
+
+    return {
+        "created": datetime.utcnow().isoformat(),
+        "store": args.store,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "events": args.events,
+            "contacts": args.contacts,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions beyond tolerance, as human readable lines"""
+    regressions = []
+    if baseline.get("store") != report["store"] or baseline.get("settings") != report["settings"]:
+        print("Warning: baseline was recorded with a different store or settings")
+    for name, current in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", choices=("mongo", "sqlite", "memory"), default="mongo", help="database to run against")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017/"))
+    parser.add_argument("--db-name", default="portfolio_benchmark", help="throwaway database, dropped before and after")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per endpoint")
+    parser.add_argument("--events", type=int, default=5000, help="analytics events to seed")
+    parser.add_argument("--contacts", type=int, default=200, help="contact messages to seed")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the seeded data")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="where to write the results")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression, as a fraction")
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    report = asyncio.run(run(args))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+
+    regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+    if regressions:
+        print(f"Performance regressions beyond {args.tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
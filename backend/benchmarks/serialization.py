@@ -0,0 +1,114 @@
+"""
+Serialization benchmark
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with FastJSONResponse
+for payloads shaped like the real endpoints.
+
+Run from the backend directory:
+    python -m benchmarks.serialization [--repeat 200]
+"""
+import argparse
+import json
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+from responses import FastJSONResponse, backend_name
+from routes.content import CONTENT_DEFAULTS
+
+
+def contacts_payload(count: int = 50, with_object_ids: bool = True) -> dict:
+    """/api/contact/list as returned straight from Mongo"""
+    now = datetime.utcnow()
+    contacts = []
+    for i in range(count):
+        doc = {
+            "id": str(uuid.uuid4()),
+            "name": f"Visitor {i}",
+            "email": f"visitor{i}@example.com",
+            "message": "Hello, I would like to talk about a project. " * 20,
+            "timestamp": now - timedelta(minutes=i),
+            "ip_address": f"203.0.113.{i % 255}",
+            "user_agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36",
+            "read": i % 3 == 0,
+        }
+        if with_object_ids:
+            doc["_id"] = ObjectId()
+        contacts.append(doc)
+    return {"success": True, "contacts": contacts}
+
+
+def status_payload(count: int = 1000) -> list:
+    """/api/status with a full page"""
+    now = datetime.utcnow()
+    return [
+        {"id": str(uuid.uuid4()), "client_name": f"client-{i}", "timestamp": now - timedelta(seconds=i)}
+        for i in range(count)
+    ]
+
+
+PAYLOADS = {
+    "/api/content/all": lambda: dict(CONTENT_DEFAULTS),
+    "/api/contact/list": contacts_payload,
+    "/api/status": status_payload,
+}
+
+
+def default_render(content) -> bytes:
+    """What FastAPI does for a handler returning a plain dict"""
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+def fast_render(content) -> bytes:
+    return FastJSONResponse(content=content).body
+
+
+def measure(func, payload, repeat: int) -> float:
+    """Best-of-5 time per call in microseconds"""
+    timer = timeit.Timer(lambda: func(payload))
+    return min(timer.repeat(repeat=5, number=repeat)) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="calls per timing run")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for endpoint, build in PAYLOADS.items():
+        payload = build()
+        try:
+            default_us = measure(default_render, payload, args.repeat)
+        except ValueError:
+            # jsonable_encoder cannot encode ObjectId; time it on the same payload without _id
+            default_us = measure(default_render, contacts_payload(with_object_ids=False), args.repeat)
+        fast_us = measure(fast_render, payload, args.repeat)
+        results.append({
+            "endpoint": endpoint,
+            "bytes": len(fast_render(payload)),
+            "default_us": round(default_us, 1),
+            "fast_us": round(fast_us, 1),
+            "saved_us": round(default_us - fast_us, 1),
+            "speedup": round(default_us / fast_us, 1),
+        })
+
+    if args.json:
+        print(json.dumps({"backend": backend_name, "results": results}, indent=2))
+        return
+
+    print(f"FastJSONResponse backend: {backend_name}")
+    print(f"{'endpoint':<22}{'bytes':>9}{'default us':>13}{'fast us':>10}{'saved us':>11}{'speedup':>9}")
+    for r in results:
+        print(f"{r['endpoint']:<22}{r['bytes']:>9}{r['default_us']:>13}{r['fast_us']:>10}{r['saved_us']:>11}{r['speedup']:>8}x")
+
+
+if __name__ == "__main__":
+    main()
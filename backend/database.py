@@ -0,0 +1,77 @@
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pathlib import Path
+from typing import Optional
+import os
+import time
+import logging
+import metrics
+import resources
+import slowlog
+
+logger = logging.getLogger(__name__)
+
+# "mongo", or "sqlite" for single-node deployments without a MongoDB server
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo').lower()
+SQLITE_PATH = os.environ.get('SQLITE_PATH', str(Path(__file__).parent / 'data' / 'portfolio.db'))
+
+# The one database client shared by every route module
+client: Optional[AsyncIOMotorClient] = None
+db: Optional[AsyncIOMotorDatabase] = None
+
+def client_options() -> dict:
+    """Connection pool settings, tunable from the environment"""
+    options = {
+        "maxPoolSize": resources.limit("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        "maxIdleTimeMS": int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '60000')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+    }
+    # e.g. "zlib" or "zstd,zlib"; off by default since mongod usually runs on the same host
+    compressors = os.environ.get('MONGO_COMPRESSORS', '')
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+def connect() -> AsyncIOMotorDatabase:
+    """Create the shared client (Motor connects lazily on first operation)"""
+    global client, db
+    if client is None and STORAGE_BACKEND == "sqlite":
+        # Same collection API as Motor, so the routes don't know the difference
+        from sqlite_store import SQLiteClient
+        name = os.environ.get('DB_NAME', 'portfolio_db')
+        client = SQLiteClient(SQLITE_PATH, name, max_workers=resources.limit("SQLITE_THREADS"))
+        db = client[name]
+    elif client is None:
+        client = AsyncIOMotorClient(
+            os.environ.get('MONGO_URL', 'mongodb://localhost:27017/'),
+            event_listeners=[metrics.MongoCommandListener(), metrics.PoolListener(), slowlog.SlowCommandListener()],
+            **client_options()
+        )
+        db = client[os.environ.get('DB_NAME', 'portfolio_db')]
+        logger.info(f"MongoDB client created with {client_options()}")
+    return db
+
+def use(new_client, name: Optional[str] = None) -> AsyncIOMotorDatabase:
+    """Share an existing Motor-compatible client instead, e.g. an in-memory stand-in for benchmarks"""
+    global client, db
+    client = new_client
+    db = client[name or os.environ.get('DB_NAME', 'portfolio_db')]
+    return db
+
+def close():
+    """Close the shared client and its connection pool"""
+    global client, db
+    if client is not None:
+        client.close()
+    client = None
+    db = None
+
+def get_db() -> AsyncIOMotorDatabase:
+    """Dependency returning the shared database, creating the client on first use"""
+    return db if db is not None else connect()
+
+async def warmup() -> float:
+    """Open the first pooled connection so the first request doesn't pay for it"""
+    started = time.perf_counter()
+    await get_db().command("ping")
+    return time.perf_counter() - started
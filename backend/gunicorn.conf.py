@@ -0,0 +1,32 @@
+# Gunicorn settings for multi-worker deployments:
+#   gunicorn -c gunicorn.conf.py server:app
+# Each worker is a separate process with its own MongoDB pool and in-process
+# caches; invalidation.py keeps those caches coherent across workers.
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import resources
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8001')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', str(min(multiprocessing.cpu_count(), 4))))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Workers read this to decide whether cross-worker cache sync is needed
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# Build the app (and its MongoDB client) after forking, never in the master
+preload_app = False
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '20'))
+keepalive = 5
+
+# Restart workers after this many requests (plus jitter) so slow memory growth
+# never reaches the container limit; off unless the resource profile sets it
+max_requests = resources.limit("GUNICORN_MAX_REQUESTS")
+max_requests_jitter = max_requests // 10
+
+accesslog = None
+errorlog = "-"
+loglevel = os.environ.get('LOG_LEVEL', 'info')
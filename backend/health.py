@@ -0,0 +1,77 @@
+from fastapi import Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import Callable, Dict, Tuple
+import asyncio
+import os
+import time
+import logging
+import metrics
+import resources
+import shutdown
+from database import get_db
+from responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Readiness limits; an instance over any of them reports 503 so orchestration
+# stops routing to it until it recovers
+READY_MAX_PING_MS = float(os.environ.get('READY_MAX_PING_MS', '250'))
+READY_MAX_CHECKOUT_WAIT_MS = float(os.environ.get('READY_MAX_CHECKOUT_WAIT_MS', '500'))
+READY_MAX_LOOP_LAG_MS = float(os.environ.get('READY_MAX_LOOP_LAG_MS', '200'))
+READY_WINDOW_SECONDS = float(os.environ.get('READY_WINDOW_SECONDS', '30'))
+
+# name -> (callable returning the current value, limit)
+_checks: Dict[str, Tuple[Callable[[], float], float]] = {}
+
+def register_check(name: str, value: Callable[[], float], limit: float):
+    """Include a measurement in the readiness check"""
+    _checks[name] = (value, limit)
+
+def register_queue(name: str, depth: Callable[[], int], limit: int):
+    """Include an internal queue's depth in the readiness check"""
+    register_check(f"queue_{name}", depth, limit)
+
+def _motor_executor_backlog() -> int:
+    """Database operations waiting for one of Motor's executor threads"""
+    try:
+        from motor.frameworks import asyncio as motor_asyncio
+        return motor_asyncio._EXECUTOR._work_queue.qsize()
+    except AttributeError:
+        return 0
+
+register_queue("requests_in_flight", lambda: metrics.in_flight, int(os.environ.get('READY_MAX_IN_FLIGHT', '200')))
+register_queue("motor_executor", _motor_executor_backlog, int(os.environ.get('READY_MAX_EXECUTOR_BACKLOG', '50')))
+# Leave rotation as soon as SIGTERM arrives, before the listeners close
+register_check("shutting_down", lambda: int(shutdown.draining), 0)
+# Step out of rotation before the container's memory limit gets this worker killed
+if resources.limit("MEMORY_BUDGET_MB"):
+    register_check("memory_rss_mb", resources.rss_mb, resources.limit("MEMORY_BUDGET_MB"))
+
+def _check(value: float, limit: float) -> dict:
+    return {"value": round(value, 3), "limit": limit, "ok": value <= limit}
+
+async def liveness():
+    """The process is up and its event loop is running"""
+    return FastJSONResponse({"status": "alive"})
+
+async def readiness(db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Whether this instance should receive traffic, with the measurements behind the answer"""
+    checks = {}
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=READY_MAX_PING_MS * 4 / 1000)
+        checks["mongo_ping_ms"] = _check((time.perf_counter() - started) * 1000, READY_MAX_PING_MS)
+    except Exception as e:
+        logger.warning(f"Readiness ping failed: {str(e) or type(e).__name__}")
+        checks["mongo_ping_ms"] = {"value": None, "limit": READY_MAX_PING_MS, "ok": False, "error": str(e) or type(e).__name__}
+
+    checks["pool_checkout_wait_ms"] = _check(metrics.recent_checkout_wait(READY_WINDOW_SECONDS) * 1000, READY_MAX_CHECKOUT_WAIT_MS)
+    checks["event_loop_lag_ms"] = _check(metrics.event_loop_lag * 1000, READY_MAX_LOOP_LAG_MS)
+    for name, (value, limit) in _checks.items():
+        checks[name] = _check(value(), limit)
+
+    ready = all(check["ok"] for check in checks.values())
+    return FastJSONResponse(
+        {"status": "ready" if ready else "degraded", "checks": checks},
+        status_code=200 if ready else 503
+    )
@@ -0,0 +1,73 @@
+from collections import defaultdict
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from typing import Awaitable, Callable, Dict, List
+import asyncio
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cross-worker cache invalidation without a broker: every topic has a version
+# counter in one small collection. Publishing bumps the counters and notifies
+# local subscribers at once; other workers see the bump on their next poll.
+COLLECTION = "cache_versions"
+
+_workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+# Polling is only needed when several worker processes share the database
+POLL_INTERVAL_SECONDS = float(os.environ.get('CACHE_SYNC_INTERVAL_SECONDS', '1' if _workers > 1 else '0'))
+
+Subscriber = Callable[[AsyncIOMotorDatabase, List[str]], Awaitable[None]]
+
+_subscribers: Dict[str, List[Subscriber]] = defaultdict(list)
+_seen_versions: Dict[str, int] = {}
+
+def subscribe(topic: str, callback: Subscriber):
+    """Register an async callback(db, topics) run when any of its topics change"""
+    _subscribers[topic].append(callback)
+
+async def _notify(db: AsyncIOMotorDatabase, topics: List[str]):
+    """Call each subscriber once with the changed topics it listens to"""
+    pending: Dict[Subscriber, List[str]] = {}
+    for topic in topics:
+        for callback in _subscribers.get(topic, []):
+            pending.setdefault(callback, []).append(topic)
+    for callback, changed in pending.items():
+        try:
+            await callback(db, changed)
+        except Exception as e:
+            logger.error(f"Invalidation subscriber failed for {changed}: {str(e)}")
+
+async def publish(db: AsyncIOMotorDatabase, *topics: str):
+    """Bump the version of each topic and notify local subscribers"""
+    if not topics:
+        return
+    await db[COLLECTION].bulk_write(
+        [UpdateOne({"_id": topic}, {"$inc": {"version": 1}}, upsert=True) for topic in topics],
+        ordered=False
+    )
+    # Our own bump is picked up by the next poll too; a second refresh is harmless
+    await _notify(db, list(topics))
+
+async def poll_once(db: AsyncIOMotorDatabase):
+    """Notify subscribers of topics whose version changed since the last poll"""
+    docs = await db[COLLECTION].find({"_id": {"$in": list(_subscribers)}}).to_list(None)
+    changed = []
+    for doc in docs:
+        if _seen_versions.get(doc["_id"]) != doc["version"]:
+            _seen_versions[doc["_id"]] = doc["version"]
+            changed.append(doc["_id"])
+    if changed:
+        await _notify(db, changed)
+
+async def run(db: AsyncIOMotorDatabase):
+    """Poll for invalidations from other workers until cancelled"""
+    if POLL_INTERVAL_SECONDS <= 0:
+        return
+    logger.info(f"Cache invalidation polling every {POLL_INTERVAL_SECONDS}s")
+    while True:
+        try:
+            await poll_once(db)
+        except Exception as e:
+            logger.warning(f"Cache invalidation poll failed: {str(e)}")
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
@@ -0,0 +1,293 @@
+from bisect import bisect_left
+from collections import deque
+from pymongo import monitoring
+from starlette.responses import PlainTextResponse
+from typing import Dict, Tuple
+import asyncio
+import threading
+import time
+import logging
+import resources
+
+logger = logging.getLogger(__name__)
+
+# Prometheus-style metrics kept in plain dicts. HTTP and event loop metrics are
+# only touched from the event loop thread, so they need no locking. MongoDB
+# command events arrive on Motor's executor threads; each thread records into
+# its own table and /metrics sums the tables when scraped.
+
+# Latency buckets in seconds (Prometheus client defaults)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Connection and auth chatter that would drown out real queries
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "buildInfo", "endSessions", "saslStart", "saslContinue"}
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def merge(self, other: "Histogram"):
+        for i, value in enumerate(other.counts):
+            self.counts[i] += value
+        self.sum += other.sum
+        self.count += other.count
+
+# HTTP metrics, keyed by (method, route template, status code)
+http_requests: Dict[Tuple[str, str, int], Histogram] = {}
+in_flight = 0
+
+# Event loop lag in seconds
+event_loop_lag = 0.0
+event_loop_lag_max = 0.0
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global in_flight
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight -= 1
+            # The router stores the matched route in the scope; use its template to bound cardinality
+            route = scope.get("route")
+            key = (scope["method"], getattr(route, "path", "unmatched"), status_code)
+            histogram = http_requests.get(key)
+            if histogram is None:
+                histogram = http_requests[key] = Histogram()
+            histogram.observe(elapsed)
+
+async def monitor_event_loop(interval: float = 0.5):
+    """Measure how late the event loop wakes up from a sleep"""
+    global event_loop_lag, event_loop_lag_max
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        event_loop_lag = max(0.0, time.perf_counter() - started - interval)
+        event_loop_lag_max = max(event_loop_lag_max, event_loop_lag)
+
+class _MongoThreadTable:
+    """Per-thread MongoDB command stats"""
+    def __init__(self):
+        self.commands: Dict[Tuple[str, str], Histogram] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+        self.collections: Dict[int, str] = {}
+        self.checkout_wait = Histogram()
+        self.checkout_started = None
+
+class _MongoThreadLocal(threading.local):
+    """Gives each thread its own table and registers it for /metrics"""
+    def __init__(self):
+        # Runs once per thread; the table is a plain object so other threads can read it
+        self.table = _MongoThreadTable()
+        with _mongo_tables_lock:
+            _mongo_tables.append(self.table)
+
+_mongo_tables = []
+_mongo_tables_lock = threading.Lock()  # only taken when a new thread records its first command
+_mongo_local = _MongoThreadLocal()
+
+def record_command(command: str, collection: str, seconds: float, failed: bool = False):
+    """Record one database command in the calling thread's table"""
+    key = (command, collection)
+    table = _mongo_local.table.commands
+    histogram = table.get(key)
+    if histogram is None:
+        histogram = table[key] = Histogram()
+    histogram.observe(seconds)
+    if failed:
+        _mongo_local.table.failures[key] = _mongo_local.table.failures.get(key, 0) + 1
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Counts MongoDB commands and their latency by command and collection"""
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        _mongo_local.table.collections[event.request_id] = collection if isinstance(collection, str) else ""
+
+    def _record(self, event, failed: bool):
+        collection = _mongo_local.table.collections.pop(event.request_id, None)
+        if collection is None:
+            return
+        record_command(event.command_name, collection, event.duration_micros / 1e6, failed)
+
+    def succeeded(self, event):
+        self._record(event, failed=False)
+
+    def failed(self, event):
+        self._record(event, failed=True)
+
+# Recent (monotonic time, seconds) connection checkout waits; deque.append is atomic
+checkout_waits = deque(maxlen=resources.limit("CHECKOUT_WAIT_SAMPLES"))
+checkout_failures = 0
+connections_in_use = 0
+_pool_lock = threading.Lock()
+
+class PoolListener(monitoring.ConnectionPoolListener):
+    """Measures how long commands wait to check a connection out of the pool"""
+
+    def connection_check_out_started(self, event):
+        # Checkout happens synchronously on the thread running the command
+        _mongo_local.table.checkout_started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        global connections_in_use
+        with _pool_lock:
+            connections_in_use += 1
+        self._finish_checkout()
+
+    def connection_check_out_failed(self, event):
+        global checkout_failures
+        with _pool_lock:
+            checkout_failures += 1
+        self._finish_checkout()
+
+    def _finish_checkout(self):
+        started = _mongo_local.table.checkout_started
+        if started is None:
+            return
+        _mongo_local.table.checkout_started = None
+        waited = time.perf_counter() - started
+        _mongo_local.table.checkout_wait.observe(waited)
+        checkout_waits.append((time.monotonic(), waited))
+
+    def connection_checked_in(self, event):
+        global connections_in_use
+        with _pool_lock:
+            connections_in_use -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+resources.register_usage("http_metrics", lambda: http_requests)
+resources.register_usage("mongo_metrics", lambda: _mongo_tables)
+resources.register_usage("pool_checkout_samples", lambda: checkout_waits, checkout_waits.maxlen)
+
+def recent_checkout_wait(window: float = 30.0) -> float:
+    """Longest connection checkout wait in the last `window` seconds"""
+    cutoff = time.monotonic() - window
+    return max((waited for at, waited in list(checkout_waits) if at >= cutoff), default=0.0)
+
+def _labels(**labels) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+def _render_histogram(lines, name: str, labels: str, histogram: Histogram):
+    cumulative = 0
+    prefix = f"{labels}," if labels else ""
+    for bound, count in zip(BUCKETS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+def render() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    lines = [
+        "# HELP http_request_duration_seconds HTTP request latency by route and status",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route, status), histogram in list(http_requests.items()):
+        _render_histogram(lines, "http_request_duration_seconds", _labels(method=method, route=route, status=status), histogram)
+
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being handled",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {in_flight}",
+        "# HELP event_loop_lag_seconds Event loop wake-up delay at the last check",
+        "# TYPE event_loop_lag_seconds gauge",
+        f"event_loop_lag_seconds {event_loop_lag}",
+        "# HELP event_loop_lag_max_seconds Largest event loop wake-up delay seen",
+        "# TYPE event_loop_lag_max_seconds gauge",
+        f"event_loop_lag_max_seconds {event_loop_lag_max}",
+    ]
+
+    commands: Dict[Tuple[str, str], Histogram] = {}
+    failures: Dict[Tuple[str, str], int] = {}
+    checkout_wait = Histogram()
+    for table in list(_mongo_tables):
+        for key, histogram in list(table.commands.items()):
+            commands.setdefault(key, Histogram()).merge(histogram)
+        for key, count in list(table.failures.items()):
+            failures[key] = failures.get(key, 0) + count
+        checkout_wait.merge(table.checkout_wait)
+
+    lines += [
+        "# HELP mongo_command_duration_seconds MongoDB command latency by command and collection",
+        "# TYPE mongo_command_duration_seconds histogram",
+    ]
+    for (command, collection), histogram in sorted(commands.items()):
+        _render_histogram(lines, "mongo_command_duration_seconds", _labels(command=command, collection=collection), histogram)
+    lines += [
+        "# HELP mongo_command_failures_total Failed MongoDB commands",
+        "# TYPE mongo_command_failures_total counter",
+    ]
+    for (command, collection), count in sorted(failures.items()):
+        lines.append(f"mongo_command_failures_total{{{_labels(command=command, collection=collection)}}} {count}")
+
+    lines += [
+        "# HELP mongo_pool_checkout_wait_seconds Time spent waiting for a pooled connection",
+        "# TYPE mongo_pool_checkout_wait_seconds histogram",
+    ]
+    _render_histogram(lines, "mongo_pool_checkout_wait_seconds", "", checkout_wait)
+    lines += [
+        "# HELP mongo_pool_checkout_failures_total Connection checkouts that failed or timed out",
+        "# TYPE mongo_pool_checkout_failures_total counter",
+        f"mongo_pool_checkout_failures_total {checkout_failures}",
+        "# HELP mongo_pool_connections_in_use Connections currently checked out",
+        "# TYPE mongo_pool_connections_in_use gauge",
+        f"mongo_pool_connections_in_use {connections_in_use}",
+    ]
+    return "\n".join(lines) + "\n"
+
+async def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 import uuid
 
@@ -19,11 +19,24 @@ class Contact(BaseModel):
     ip_address: Optional[str] = None
     user_agent: Optional[str] = None
     read: bool = False
+    archived: bool = False
 
 class ContactResponse(BaseModel):
     success: bool
     message: str
 
+class ContactFilter(BaseModel):
+    older_than: Optional[datetime] = None
+    ip_address: Optional[str] = None
+    email: Optional[str] = None
+    unread: Optional[bool] = None
+
+class ContactBulkRequest(BaseModel):
+    action: Literal["mark_read", "archive", "delete"]
+    # Either explicit ids or a filter
+    ids: Optional[List[str]] = None
+    filter: Optional[ContactFilter] = None
+
 # Analytics Models
 class AnalyticsEventCreate(BaseModel):
     event_type: str
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Union, Literal
 
 # Content Update Models
 class PersonalInfoUpdate(BaseModel):
@@ -58,3 +59,29 @@ class WebsiteSettings(BaseModel):
     enable_analytics: Optional[bool] = None
     enable_contact_form: Optional[bool] = None
     enable_threat_map: Optional[bool] = None
+
+# Bulk Content Models
+class BulkOperation(BaseModel):
+    op: Literal["create", "update", "delete", "reorder"]
+    key: Optional[Union[int, str]] = None
+    data: Optional[Dict[str, Any]] = None
+    order: Optional[List[Union[int, str]]] = None
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation]
+    ordered: bool = True
+
+# Portfolio Bundle Models
+BUNDLE_VERSION = 1
+
+class PortfolioBundle(BaseModel):
+    version: int = BUNDLE_VERSION
+    exported_at: Optional[datetime] = None
+    # Sections left out of a bundle are not touched on import
+    personal_info: Optional[PersonalInfoUpdate] = None
+    skills: Optional[List[SkillUpdate]] = None
+    projects: Optional[List[ProjectUpdate]] = None
+    certifications: Optional[List[CertificationUpdate]] = None
+    experience: Optional[List[ExperienceUpdate]] = None
+    education: Optional[List[EducationUpdate]] = None
+    settings: Optional[WebsiteSettings] = None
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+import asyncio
+import hashlib
+import hmac
+import math
+import os
+import re
+import threading
+import time
+import logging
+import bcrypt
+import resources
+
+logger = logging.getLogger(__name__)
+
+# bcrypt runs on its own small thread pool (it releases the GIL), so a burst of
+# logins queues there instead of blocking the event loop
+PASSWORD_HASH_THREADS = resources.limit("PASSWORD_HASH_THREADS")
+# Hash operations allowed to wait for a thread; beyond this logins are refused
+PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', '16'))
+# The bcrypt cost is chosen at first use so one hash takes about this long here
+PASSWORD_HASH_TARGET_MS = float(os.environ.get('PASSWORD_HASH_TARGET_MS', '250'))
+# Fixed cost instead of calibrating, e.g. to keep several hosts identical
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '0'))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+LEGACY_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_THREADS, thread_name_prefix="password-hash")
+_pending = 0
+_rounds: Optional[int] = None
+_rounds_lock = threading.Lock()
+# Checked when the user does not exist, so the response takes as long as a real check
+_dummy_hash: Optional[bytes] = None
+
+class PasswordHashBusy(Exception):
+    """Too many password operations are already queued"""
+
+def calibrate(target_ms: float = PASSWORD_HASH_TARGET_MS) -> int:
+    """The bcrypt cost whose hash takes closest to (not above) target_ms on this host"""
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(8))
+    elapsed_ms = max((time.perf_counter() - started) * 1000, 0.01)
+    # Each additional round doubles the work
+    rounds = 8 + math.floor(math.log2(target_ms / elapsed_ms))
+    rounds = min(max(rounds, BCRYPT_MIN_ROUNDS), BCRYPT_MAX_ROUNDS)
+    logger.info(f"bcrypt cost {rounds} (cost 8 took {elapsed_ms:.1f}ms, target {target_ms}ms)")
+    return rounds
+
+def rounds() -> int:
+    """The bcrypt cost for new hashes, calibrated once per process"""
+    global _rounds, _dummy_hash
+    if _rounds is None:
+        with _rounds_lock:
+            if _rounds is None:
+                cost = BCRYPT_ROUNDS or calibrate()
+                _dummy_hash = bcrypt.hashpw(b"dummy", bcrypt.gensalt(cost))
+                _rounds = cost
+    return _rounds
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds())).decode()
+
+def _check(password: str, stored: Optional[str]) -> Tuple[bool, bool]:
+    if stored is None:
+        rounds()
+        bcrypt.checkpw(password.encode(), _dummy_hash)
+        return False, False
+    if LEGACY_SHA256_RE.match(stored):
+        # Unsalted SHA-256 from before bcrypt; always upgraded after a successful login
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored), True
+    try:
+        ok = bcrypt.checkpw(password.encode(), stored.encode())
+    except ValueError:
+        return False, False
+    return ok, ok and bcrypt_cost(stored) < rounds()
+
+def bcrypt_cost(stored: str) -> int:
+    """The cost factor recorded in a bcrypt hash ($2b$12$...)"""
+    return int(stored.split("$")[2])
+
+async def _run(fn, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_THREADS + PASSWORD_HASH_QUEUE:
+        raise PasswordHashBusy()
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+async def hash_password(password: str) -> str:
+    """bcrypt hash of a password, computed off the event loop"""
+    return await _run(_hash, password)
+
+async def verify_password(password: str, stored: Optional[str]) -> Tuple[bool, bool]:
+    """
+    Check a password against a stored hash off the event loop.
+    Returns (matches, needs_rehash); needs_rehash is set for legacy SHA-256
+    hashes and bcrypt hashes below the current cost. Pass stored=None for an
+    unknown user to spend the same time as a real check.
+    """
+    return await _run(_check, password, stored)
@@ -0,0 +1,158 @@
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import asyncio
+import cProfile
+import os
+import sys
+import threading
+import time
+import uuid
+import logging
+import resources
+
+logger = logging.getLogger(__name__)
+
+# On-demand profiling of single requests. An admin sends "X-Profile: sample"
+# (folded stacks for flamegraph.pl / speedscope) or "X-Profile: cprofile"
+# (pstats for snakeviz); the profile id comes back in X-Profile-Id and the file
+# can be downloaded from /api/diagnostics/profiles/{id}. Requests without the
+# header only pay for one header lookup.
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', '/tmp/portfolio-profiles'))
+PROFILE_KEEP = resources.limit('PROFILE_KEEP')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '2'))
+
+PROFILE_MODES = {"sample": ".folded", "cprofile": ".pstats"}
+
+# Only one request is profiled at a time; both profilers see the whole event loop thread
+_busy = False
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into folded-stack counts"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Path of a stored profile, or None for unknown or malformed ids"""
+    for suffix in PROFILE_MODES.values():
+        path = PROFILE_DIR / f"{profile_id}{suffix}"
+        if path.parent == PROFILE_DIR and path.is_file():
+            return path
+    return None
+
+def list_profiles() -> list:
+    """Stored profiles, newest first"""
+    if not PROFILE_DIR.is_dir():
+        return []
+    files = sorted(PROFILE_DIR.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {"id": p.stem, "format": p.suffix[1:], "bytes": p.stat().st_size, "created": datetime.utcfromtimestamp(p.stat().st_mtime)}
+        for p in files if p.suffix in PROFILE_MODES.values()
+    ]
+
+def _store(profile_id: str, mode: str, data):
+    """Write a profile and prune the oldest beyond PROFILE_KEEP"""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / f"{profile_id}{PROFILE_MODES[mode]}"
+    if mode == "cprofile":
+        data.dump_stats(str(path))
+    else:
+        path.write_text(data)
+    for stale in list_profiles()[PROFILE_KEEP:]:
+        stale_path = profile_path(stale["id"])
+        if stale_path is None:
+            # Already pruned, e.g. by another worker sharing PROFILE_DIR
+            logger.debug(f"Profile {stale['id']} already gone, not pruning it")
+            continue
+        stale_path.unlink(missing_ok=True)
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that carry X-Profile from an authenticated admin"""
+
+    def __init__(self, app, authenticate):
+        self.app = app
+        # async callable(authorization header) -> username, raising if not an admin
+        self.authenticate = authenticate
+
+    async def __call__(self, scope, receive, send):
+        global _busy
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = _header(scope, b"x-profile")
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        mode = mode.strip().lower() or "sample"
+        if mode not in PROFILE_MODES or _busy:
+            await self.app(scope, receive, send)
+            return
+        try:
+            user = await self.authenticate(_header(scope, b"authorization"))
+        except Exception:
+            # Not an admin: serve the request as if the header wasn't there
+            await self.app(scope, receive, send)
+            return
+
+        _busy = True
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            profiler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            if mode == "cprofile":
+                profiler.disable()
+                data = profiler
+            else:
+                data = await asyncio.to_thread(profiler.stop)
+            _busy = False
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            try:
+                await asyncio.to_thread(_store, profile_id, mode, data)
+                logger.info(f"Profiled {scope['method']} {scope['path']} for {user} ({mode}, {elapsed_ms:.1f}ms): {profile_id}")
+            except Exception as e:
+                logger.error(f"Failed to store profile {profile_id}: {str(e)}")
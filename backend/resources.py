@@ -0,0 +1,124 @@
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+import gc
+import os
+import sys
+import resource
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Size limits for every bounded structure in the backend, chosen as a set by
+# RESOURCE_PROFILE. "low" fits a worker into the 256-512M container limits
+# suggested for a Raspberry Pi. Any single limit can still be overridden by
+# setting the environment variable of the same name.
+#
+# RESOURCE_PROFILE has to be set in the process environment (not backend/.env):
+# Motor sizes its executor from MOTOR_MAX_WORKERS when it is first imported.
+RESOURCE_PROFILE = os.environ.get('RESOURCE_PROFILE', 'standard')
+
+PROFILES = {
+    "standard": {
+        "MONGO_MAX_POOL_SIZE": 10,
+        "MOTOR_MAX_WORKERS": None,          # Motor's default, 5 per CPU
+        "SQLITE_THREADS": 4,                # with STORAGE_BACKEND=sqlite
+        "PASSWORD_HASH_THREADS": 2,         # concurrent bcrypt hashes per worker
+        "SLOW_LOG_SIZE": 200,
+        "PROFILE_KEEP": 20,
+        "CHECKOUT_WAIT_SAMPLES": 256,
+        "ANALYTICS_MAX_EVENTS": 10000,      # events loaded per stats request
+        "CONTENT_MAX_ITEMS": 100,           # items read per content section
+        "CONTACT_PAGE_MAX": 200,
+        "TOKEN_CACHE_SIZE": 1024,           # verified admin tokens kept per worker
+        "MAX_BULK_OPERATIONS": 500,
+        "GUNICORN_MAX_REQUESTS": 0,         # never recycle workers
+        "MEMORY_BUDGET_MB": 0,              # no readiness check on memory
+    },
+    "low": {
+        "MONGO_MAX_POOL_SIZE": 4,
+        "MOTOR_MAX_WORKERS": 4,
+        "SQLITE_THREADS": 2,
+        "PASSWORD_HASH_THREADS": 1,
+        "SLOW_LOG_SIZE": 50,
+        "PROFILE_KEEP": 5,
+        "CHECKOUT_WAIT_SAMPLES": 64,
+        "ANALYTICS_MAX_EVENTS": 2000,
+        "CONTENT_MAX_ITEMS": 100,
+        "CONTACT_PAGE_MAX": 50,
+        "TOKEN_CACHE_SIZE": 64,
+        "MAX_BULK_OPERATIONS": 100,
+        "GUNICORN_MAX_REQUESTS": 5000,
+        "MEMORY_BUDGET_MB": 200,
+    },
+}
+
+if RESOURCE_PROFILE not in PROFILES:
+    logger.warning(f"Unknown RESOURCE_PROFILE {RESOURCE_PROFILE!r}, using standard")
+    RESOURCE_PROFILE = "standard"
+
+def limit(name: str) -> Optional[int]:
+    """A limit from the environment, falling back to the active profile"""
+    value = os.environ.get(name)
+    if value:
+        return int(value)
+    return PROFILES[RESOURCE_PROFILE][name]
+
+# Motor reads this when motor.frameworks.asyncio is imported
+if limit("MOTOR_MAX_WORKERS"):
+    os.environ.setdefault("MOTOR_MAX_WORKERS", str(limit("MOTOR_MAX_WORKERS")))
+
+# name -> (callable returning the tracked objects, limit)
+_usage: Dict[str, Tuple[Callable[[], object], Optional[int]]] = {}
+
+def register_usage(name: str, objects: Callable[[], object], capacity: Optional[int] = None):
+    """Include a subsystem's in-memory structures in the memory report"""
+    _usage[name] = (objects, capacity)
+
+def deep_sizeof(obj, seen: Optional[set] = None) -> int:
+    """Approximate bytes held by an object and everything it references"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in list(obj.items()))
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in list(obj))
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, slot), seen) for slot in obj.__slots__ if hasattr(obj, slot))
+    return size
+
+def rss_bytes() -> int:
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # Peak rather than current outside Linux; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def rss_mb() -> float:
+    return rss_bytes() / 1024 / 1024
+
+def report() -> dict:
+    """Memory use by subsystem; sizes are estimates from walking each structure"""
+    subsystems = {}
+    for name, (objects, capacity) in _usage.items():
+        tracked = objects()
+        subsystems[name] = {
+            "items": len(tracked) if hasattr(tracked, "__len__") else None,
+            "limit": capacity,
+            "bytes": deep_sizeof(tracked),
+        }
+    return {
+        "profile": RESOURCE_PROFILE,
+        "rss_mb": round(rss_mb(), 1),
+        "budget_mb": limit("MEMORY_BUDGET_MB") or None,
+        "limits": {name: limit(name) for name in PROFILES[RESOURCE_PROFILE]},
+        "subsystems": subsystems,
+        "gc_counts": gc.get_count(),
+    }
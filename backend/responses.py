@@ -0,0 +1,61 @@
+from bson import ObjectId
+from decimal import Decimal
+from starlette.responses import JSONResponse
+import json
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# orjson (default), msgspec or json; falls back to json if the package is missing
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'orjson').lower()
+
+def _default(obj):
+    """Encode the non-JSON types that come back from MongoDB and pydantic"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_dumps(content) -> bytes:
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+def _load_backend():
+    """Pick the encoder for JSON_BACKEND"""
+    if JSON_BACKEND == "orjson":
+        try:
+            import orjson
+            options = orjson.OPT_NON_STR_KEYS
+            return "orjson", lambda content: orjson.dumps(content, default=_default, option=options)
+        except ImportError:
+            logger.warning("orjson not installed, falling back to json")
+    elif JSON_BACKEND == "msgspec":
+        try:
+            import msgspec
+            encoder = msgspec.json.Encoder(enc_hook=_default)
+            return "msgspec", encoder.encode
+        except ImportError:
+            logger.warning("msgspec not installed, falling back to json")
+    return "json", _json_dumps
+
+backend_name, dumps = _load_backend()
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson/msgspec. Datetimes are encoded natively and
+    ObjectIds as strings, so handlers can return raw Mongo documents directly
+    and skip FastAPI's recursive jsonable_encoder pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Request, Query
+from fastapi import APIRouter, Request, Query, Depends
 from models import (
     AnalyticsEventCreate, 
     AnalyticsEvent, 
@@ -9,21 +9,21 @@ from models import (
     DeviceStat,
     RecentVisitor
 )
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from database import get_db
 from datetime import datetime, timedelta
 from typing import Optional
-import os
 import logging
 import re
+import resources
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
-# Get database connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'portfolio_db')]
+# Events loaded per stats request; any beyond this are left out of the stats
+ANALYTICS_MAX_EVENTS = resources.limit("ANALYTICS_MAX_EVENTS")
+
 
 def parse_user_agent(user_agent: str) -> str:
     """
@@ -85,7 +85,7 @@ def get_location_from_ip(ip_address: str) -> str:
     return 'Unknown'
 
 @router.post("/track", response_model=TrackingResponse)
-async def track_event(event_data: AnalyticsEventCreate, request: Request):
+async def track_event(event_data: AnalyticsEventCreate, request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Track analytics events (page views, clicks)
     """
@@ -125,7 +125,7 @@ async def track_event(event_data: AnalyticsEventCreate, request: Request):
         return TrackingResponse(success=False, event_id="")
 
 @router.get("/stats", response_model=AnalyticsStats)
-async def get_analytics_stats(time_range: str = Query(default="7d")):
+async def get_analytics_stats(time_range: str = Query(default="7d"), db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Get analytics statistics for dashboard
     """
@@ -142,7 +142,7 @@ async def get_analytics_stats(time_range: str = Query(default="7d")):
         # Get all events in time range
         events = await db.analytics_events.find(
             {"timestamp": {"$gte": start_date}}
-        ).to_list(10000)
+        ).to_list(ANALYTICS_MAX_EVENTS)
         
         # Calculate total visits (page_view events)
         total_visits = sum(1 for e in events if e.get('event_type') == 'page_view')
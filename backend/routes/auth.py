@@ -1,54 +1,153 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
 from models_auth import LoginRequest, LoginResponse, PasswordChangeRequest, AdminUser, TokenData
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from database import get_db
+from collections import OrderedDict
+from passwords import hash_password, verify_password, PasswordHashBusy
+import invalidation
+import resources
 import os
+import time
 import logging
-import hashlib
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import jwt
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import asyncio
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
-# Get database connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'portfolio_db')]
 
 # Secret key for JWT (in production, use environment variable)
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-this-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 
-def hash_password(password: str) -> str:
-    """Hash password using SHA256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+# Verified tokens -> (username, exp as a unix timestamp, jti), least recently used first.
+# A hit skips the signature check and the admin_users lookup.
+TOKEN_CACHE_SIZE = resources.limit("TOKEN_CACHE_SIZE")
+USERS_TOPIC = "auth.users"
+_verified_tokens: "OrderedDict[str, Tuple[str, float, Optional[str]]]" = OrderedDict()
+# Bumped on every invalidation so a lookup that raced with one is not cached
+_cache_generation = 0
+
+# Revoked token ids live in a TTL collection until the token would have expired
+# anyway. Each worker mirrors the unexpired ones in memory (jti -> exp), so the
+# check on every request is a dict lookup; other workers reload on REVOKED_TOPIC.
+REVOKED_COLLECTION = "revoked_tokens"
+REVOKED_TOPIC = "auth.revoked"
+_revoked: Dict[str, float] = {}
+_revoked_lock = asyncio.Lock()
+_revoked_loaded = False
 
 def create_access_token(username: str) -> str:
     """Create JWT access token"""
     expire = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
-    to_encode = {"sub": username, "exp": expire}
+    to_encode = {"sub": username, "exp": expire, "jti": secrets.token_hex(16)}
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[str]:
-    """Verify JWT token and return username"""
+def decode_token(token: str) -> Optional[dict]:
+    """Verify JWT token and return its claims"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        if payload.get("sub") is None:
             return None
-        return username
+        return payload
     except jwt.ExpiredSignatureError:
         return None
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
+        return None
+
+def verify_token(token: str) -> Optional[str]:
+    """Verify JWT token and return username"""
+    payload = decode_token(token)
+    return payload["sub"] if payload else None
+
+def _cached_user(token: str) -> Optional[str]:
+    entry = _verified_tokens.get(token)
+    if entry is None:
+        return None
+    username, expires, jti = entry
+    if expires <= time.time() or jti in _revoked:
+        _verified_tokens.pop(token, None)
         return None
+    _verified_tokens.move_to_end(token)
+    return username
+
+def _remember_token(token: str, username: str, expires: float, jti: Optional[str]):
+    _verified_tokens[token] = (username, expires, jti)
+    _verified_tokens.move_to_end(token)
+    while len(_verified_tokens) > TOKEN_CACHE_SIZE:
+        _verified_tokens.popitem(last=False)
+
+async def _forget_tokens(db: AsyncIOMotorDatabase, topics):
+    global _cache_generation
+    _cache_generation += 1
+    _verified_tokens.clear()
+
+async def users_changed(db: AsyncIOMotorDatabase):
+    """Drop cached tokens in every worker after a password change or user deletion"""
+    await invalidation.publish(db, USERS_TOPIC)
 
-async def get_current_user(authorization: str = Header(None)):
+async def _load_revocations(db: AsyncIOMotorDatabase, topics=None):
+    """Replace the in-memory mirror with the unexpired revocations"""
+    global _revoked
+    docs = await db[REVOKED_COLLECTION].find(
+        {"expires_at": {"$gt": datetime.utcnow()}}, {"expires_at": 1}
+    ).to_list(None)
+    _revoked = {doc["_id"]: doc["expires_at"].replace(tzinfo=timezone.utc).timestamp() for doc in docs}
+
+async def ensure_revocations(db: AsyncIOMotorDatabase):
+    """Create the TTL index and load the revocation mirror (once per process)"""
+    global _revoked_loaded
+    if _revoked_loaded:
+        return
+    async with _revoked_lock:
+        if _revoked_loaded:
+            return
+        await db[REVOKED_COLLECTION].create_index("expires_at", expireAfterSeconds=0)
+        await _load_revocations(db)
+        _revoked_loaded = True
+
+def is_revoked(jti: Optional[str]) -> bool:
+    """Whether a token id was revoked; a dict lookup, pruning entries past expiry"""
+    expires = _revoked.get(jti)
+    if expires is None:
+        return False
+    if expires <= time.time():
+        # The token has expired anyway; the TTL index removes the document
+        _revoked.pop(jti, None)
+        return False
+    return True
+
+async def revoke_token(db: AsyncIOMotorDatabase, payload: dict):
+    """Deny a token until it expires, in every worker"""
+    jti = payload.get("jti")
+    if not jti:
+        return
+    expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc).replace(tzinfo=None)
+    await db[REVOKED_COLLECTION].update_one(
+        {"_id": jti},
+        {"$set": {"expires_at": expires_at, "username": payload.get("sub"), "revoked_at": datetime.utcnow()}},
+        upsert=True
+    )
+    _revoked[jti] = float(payload["exp"])
+    await invalidation.publish(db, REVOKED_TOPIC)
+
+invalidation.subscribe(USERS_TOPIC, _forget_tokens)
+invalidation.subscribe(REVOKED_TOPIC, _load_revocations)
+resources.register_usage("verified_tokens", lambda: _verified_tokens, TOKEN_CACHE_SIZE)
+resources.register_usage("revoked_tokens", lambda: _revoked)
+
+async def get_current_user(authorization: str = Header(None), db: AsyncIOMotorDatabase = Depends(get_db)):
     """Dependency to get current authenticated user"""
+    return await authenticate(db, authorization)
+
+def bearer_token(authorization: Optional[str]) -> str:
+    """The token from an Authorization header, raising 401 if there is none"""
     if not authorization:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
@@ -58,19 +157,33 @@ async def get_current_user(authorization: str = Header(None)):
             raise HTTPException(status_code=401, detail="Invalid authentication scheme")
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid authorization header")
+    return token
+
+async def authenticate(db: AsyncIOMotorDatabase, authorization: Optional[str]) -> str:
+    """Resolve an Authorization header to a username, raising 401 if it is not valid"""
+    token = bearer_token(authorization)
+    await ensure_revocations(db)
     
-    username = verify_token(token)
-    if not username:
+    username = _cached_user(token)
+    if username:
+        return username
+    
+    payload = decode_token(token)
+    if not payload or is_revoked(payload.get("jti")):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    username = payload["sub"]
     
-    user = await db.admin_users.find_one({"username": username})
+    generation = _cache_generation
+    user = await db.admin_users.find_one({"username": username}, {"_id": 1})
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
+    if generation == _cache_generation and isinstance(payload.get("exp"), (int, float)):
+        _remember_token(token, username, payload["exp"], payload.get("jti"))
     return username
 
 @router.post("/login", response_model=LoginResponse)
-async def login(credentials: LoginRequest):
+async def login(credentials: LoginRequest, db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Login endpoint - Default credentials: username=admin, password=password
     """
@@ -85,7 +198,7 @@ async def login(credentials: LoginRequest):
                 default_admin = {
                     "id": str(secrets.token_hex(16)),
                     "username": "admin",
-                    "password_hash": hash_password("password"),
+                    "password_hash": await hash_password("password"),
                     "created_at": datetime.utcnow(),
                     "last_login": None
                 }
@@ -93,23 +206,29 @@ async def login(credentials: LoginRequest):
                 user = default_admin
                 logger.info("Default admin user created")
             else:
+                # Take as long as a real check so usernames can't be probed by timing
+                await verify_password(credentials.password, None)
                 return LoginResponse(
                     success=False,
                     message="Invalid credentials"
                 )
         
         # Verify password
-        password_hash = hash_password(credentials.password)
-        if password_hash != user.get("password_hash"):
+        valid, needs_rehash = await verify_password(credentials.password, user.get("password_hash"))
+        if not valid:
             return LoginResponse(
                 success=False,
                 message="Invalid credentials"
             )
         
-        # Update last login
+        # Update last login, upgrading legacy or weaker hashes now that we have the password
+        update = {"last_login": datetime.utcnow()}
+        if needs_rehash:
+            update["password_hash"] = await hash_password(credentials.password)
+            logger.info(f"Upgraded password hash for user: {credentials.username}")
         await db.admin_users.update_one(
             {"username": credentials.username},
-            {"$set": {"last_login": datetime.utcnow()}}
+            {"$set": update}
         )
         
         # Create token
@@ -125,6 +244,9 @@ async def login(credentials: LoginRequest):
             }
         )
     
+    except PasswordHashBusy:
+        raise HTTPException(status_code=503, detail="Too many login attempts, try again shortly",
+                            headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(status_code=500, detail="Login failed")
@@ -132,7 +254,8 @@ async def login(credentials: LoginRequest):
 @router.post("/change-password")
 async def change_password(
     password_data: PasswordChangeRequest,
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
     Change password for authenticated user
@@ -144,21 +267,25 @@ async def change_password(
             raise HTTPException(status_code=404, detail="User not found")
         
         # Verify current password
-        current_password_hash = hash_password(password_data.current_password)
-        if current_password_hash != user.get("password_hash"):
+        valid, _ = await verify_password(password_data.current_password, user.get("password_hash"))
+        if not valid:
             return {"success": False, "message": "Current password is incorrect"}
         
         # Update password
-        new_password_hash = hash_password(password_data.new_password)
+        new_password_hash = await hash_password(password_data.new_password)
         await db.admin_users.update_one(
             {"username": current_user},
             {"$set": {"password_hash": new_password_hash}}
         )
+        await users_changed(db)
         
         logger.info(f"Password changed for user: {current_user}")
         
         return {"success": True, "message": "Password changed successfully"}
     
+    except PasswordHashBusy:
+        raise HTTPException(status_code=503, detail="Too many password operations, try again shortly",
+                            headers={"Retry-After": "1"})
     except Exception as e:
         logger.error(f"Password change error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to change password")
@@ -171,8 +298,21 @@ async def verify_token_endpoint(current_user: str = Depends(get_current_user)):
     return {"success": True, "username": current_user}
 
 @router.post("/logout")
-async def logout(current_user: str = Depends(get_current_user)):
+async def logout(
+    authorization: str = Header(None),
+    current_user: str = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
     """
-    Logout endpoint (token should be removed on client side)
+    Logout endpoint - revokes the token in every worker until it expires
     """
-    return {"success": True, "message": "Logged out successfully"}
+    try:
+        payload = decode_token(bearer_token(authorization))
+        if payload:
+            await revoke_token(db, payload)
+        logger.info(f"Token revoked for user: {current_user}")
+        return {"success": True, "message": "Logged out successfully"}
+    
+    except Exception as e:
+        logger.error(f"Logout error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to log out")
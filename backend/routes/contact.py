@@ -1,20 +1,159 @@
-from fastapi import APIRouter, Request, HTTPException
-from models import ContactCreate, Contact, ContactResponse
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi import APIRouter, Request, HTTPException, Depends
+from models import ContactCreate, Contact, ContactResponse, ContactBulkRequest
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from database import get_db
+from routes.auth import get_current_user
+from responses import FastJSONResponse
+from datetime import datetime, timezone
+from typing import Optional
+import asyncio
+import base64
+import binascii
+import json
 import os
 import logging
+import resources
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/contact", tags=["contact"])
 
-# Get database connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'portfolio_db')]
+CONTACT_PAGE_MAX = resources.limit("CONTACT_PAGE_MAX")
+# Characters of each message returned by the summary view
+SUMMARY_MESSAGE_CHARS = 200
+SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "email": 1, "timestamp": 1, "read": 1,
+    "message": {"$substrCP": ["$message", 0, SUMMARY_MESSAGE_CHARS]},
+    "message_length": {"$strLenCP": "$message"},
+}
+
+MAX_BULK_OPERATIONS = resources.limit("MAX_BULK_OPERATIONS")
+
+# Inbox counters live in one document of the shared counters collection. Every
+# write adjusts them with $inc; reconciliation recounts them in case a worker
+# died between a write and its counter update. total and unread cover the
+# inbox; archived messages only count towards archived.
+STATS_ID = "contact_stats"
+STATS_FIELDS = ("total", "unread", "archived")
+
+INBOX = {"archived": {"$ne": True}}
+ARCHIVED = {"archived": True}
+UNREAD = {"read": False}
+READ = {"read": {"$ne": False}}
+
+# Every contact is in exactly one of these states; each adds these amounts to the counters
+STATES = {
+    "inbox_unread": ({**INBOX, **UNREAD}, {"total": 1, "unread": 1}),
+    "inbox_read": ({**INBOX, **READ}, {"total": 1}),
+    "archived_unread": ({**ARCHIVED, **UNREAD}, {"archived": 1}),
+    "archived_read": ({**ARCHIVED, **READ}, {"archived": 1}),
+}
+# action -> (update, state transitions); a None target state means deleted
+BULK_ACTIONS = {
+    "mark_read": ({"$set": {"read": True}}, {"inbox_unread": "inbox_read", "archived_unread": "archived_read"}),
+    "archive": ({"$set": {"archived": True}}, {"inbox_unread": "archived_unread", "inbox_read": "archived_read"}),
+    "delete": (None, {state: None for state in STATES}),
+}
+CONTACT_STATS_RECONCILE_SECONDS = float(os.environ.get('CONTACT_STATS_RECONCILE_SECONDS', '3600'))
+
+_index_lock = asyncio.Lock()
+_indexes_ready = False
+
+async def ensure_contact_indexes(db: AsyncIOMotorDatabase):
+    """Indexes for paging the inbox or the archive newest first, all or unread only (once per process)"""
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    async with _index_lock:
+        if _indexes_ready:
+            return
+        await db.contacts.create_index([("archived", 1), ("timestamp", -1), ("id", -1)])
+        await db.contacts.create_index([("archived", 1), ("read", 1), ("timestamp", -1), ("id", -1)])
+        _indexes_ready = True
+
+def encode_cursor(contact: dict) -> str:
+    """Opaque position after a contact in (timestamp, id) descending order"""
+    position = {"t": contact["timestamp"].isoformat(), "id": contact["id"]}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """Query matching contacts after a cursor, raising 400 if it is malformed"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        timestamp = datetime.fromisoformat(position["t"])
+        contact_id = str(position["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "id": {"$lt": contact_id}},
+    ]}
+
+
+async def adjust_stats(db: AsyncIOMotorDatabase, **deltas: int):
+    """Atomically add to the inbox counters"""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if deltas:
+        await db.counters.update_one({"_id": STATS_ID}, {"$inc": deltas}, upsert=True)
+
+async def apply_action(db: AsyncIOMotorDatabase, selection: dict, action: str) -> int:
+    """
+    Run a bulk action on the selected contacts with one update_many/delete_many
+    per state it changes, so each call knows exactly which counters to move.
+    That is up to four sequential writes, not atomic with each other or with
+    the counter update: a contact changed concurrently between them can leave
+    the counters off until reconcile_stats_periodically corrects them.
+    """
+    update, transitions = BULK_ACTIONS[action]
+    affected = 0
+    deltas = dict.fromkeys(STATS_FIELDS, 0)
+    for source, target in transitions.items():
+        query = {"$and": [selection, STATES[source][0]]}
+        if update is None:
+            count = (await db.contacts.delete_many(query)).deleted_count
+        else:
+            count = (await db.contacts.update_many(query, update)).modified_count
+        if not count:
+            continue
+        affected += count
+        for field, weight in STATES[source][1].items():
+            deltas[field] -= weight * count
+        for field, weight in (STATES[target][1].items() if target else ()):
+            deltas[field] += weight * count
+    await adjust_stats(db, **deltas)
+    return affected
+
+async def reconcile_stats(db: AsyncIOMotorDatabase) -> dict:
+    """Recount the inbox and overwrite the counters"""
+    stats = {
+        "total": await db.contacts.count_documents(INBOX),
+        "unread": await db.contacts.count_documents({**INBOX, **UNREAD}),
+        "archived": await db.contacts.count_documents(ARCHIVED),
+    }
+    await db.counters.update_one(
+        {"_id": STATS_ID},
+        {"$set": {**stats, "reconciled_at": datetime.utcnow()}},
+        upsert=True
+    )
+    return stats
+
+async def reconcile_stats_periodically(db: AsyncIOMotorDatabase):
+    """Correct counter drift every CONTACT_STATS_RECONCILE_SECONDS until cancelled"""
+    if CONTACT_STATS_RECONCILE_SECONDS <= 0:
+        return
+    while True:
+        await asyncio.sleep(CONTACT_STATS_RECONCILE_SECONDS)
+        try:
+            before = await db.counters.find_one({"_id": STATS_ID})
+            after = await reconcile_stats(db)
+            drift = {field: after[field] - (before or {}).get(field, 0) for field in STATS_FIELDS}
+            if any(drift.values()):
+                logger.warning(f"Contact counters drifted by {drift}, corrected")
+        except Exception as e:
+            logger.warning(f"Contact counter reconciliation failed: {str(e)}")
 
 @router.post("", response_model=ContactResponse)
-async def create_contact(contact_data: ContactCreate, request: Request):
+async def create_contact(contact_data: ContactCreate, request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Handle contact form submission
     """
@@ -37,6 +176,7 @@ async def create_contact(contact_data: ContactCreate, request: Request):
         
         # Save to database
         result = await db.contacts.insert_one(contact.dict())
+        await adjust_stats(db, total=1, unread=1)
         
         logger.info(f"Contact form submitted by {contact_data.email} from IP {client_ip}")
         
@@ -50,29 +190,108 @@ async def create_contact(contact_data: ContactCreate, request: Request):
         raise HTTPException(status_code=500, detail="Failed to submit contact form")
 
 @router.get("/list")
-async def list_contacts(skip: int = 0, limit: int = 50, unread_only: bool = False):
+async def list_contacts(
+    limit: int = 50,
+    unread_only: bool = False,
+    archived: bool = False,
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    skip: int = 0,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
     """
-    List all contacts (admin endpoint)
+    List contacts newest first (admin endpoint). Pass the response's
+    `next_cursor` as `cursor` for the next page; each page costs the same
+    however deep it is. `summary=true` truncates messages to
+    SUMMARY_MESSAGE_CHARS and drops IP and user agent. `skip` is still
+    honoured without a cursor but gets slower with the offset.
+    `archived=true` lists archived contacts instead of the inbox.
     """
+    query = dict(ARCHIVED if archived else INBOX)
+    if unread_only:
+        query.update(UNREAD)
+    if cursor:
+        query = {"$and": [query, decode_cursor(cursor)]}
     try:
-        query = {"read": False} if unread_only else {}
-        contacts = await db.contacts.find(query).sort("timestamp", -1).skip(skip).limit(limit).to_list(limit)
-        return {"success": True, "contacts": contacts}
+        await ensure_contact_indexes(db)
+        limit = max(1, min(limit, CONTACT_PAGE_MAX))
+        projection = SUMMARY_PROJECTION if summary else {"_id": 0}
+        find = db.contacts.find(query, projection).sort([("timestamp", -1), ("id", -1)])
+        if skip and not cursor:
+            find = find.skip(skip)
+        contacts = await find.limit(limit).to_list(limit)
+        next_cursor = encode_cursor(contacts[-1]) if len(contacts) == limit else None
+        # Datetimes are encoded natively by the response class
+        return FastJSONResponse({"success": True, "contacts": contacts, "next_cursor": next_cursor})
     except Exception as e:
         logger.error(f"Error fetching contacts: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch contacts")
 
 @router.patch("/{contact_id}/read")
-async def mark_contact_read(contact_id: str):
+async def mark_contact_read(contact_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Mark a contact as read
     """
     try:
-        result = await db.contacts.update_one(
-            {"id": contact_id},
-            {"$set": {"read": True}}
-        )
-        return {"success": True, "modified": result.modified_count}
+        # Only an unread contact changes, so the counter moves once however often this is called
+        modified = await apply_action(db, {"id": contact_id}, "mark_read")
+        return {"success": True, "modified": modified}
     except Exception as e:
         logger.error(f"Error updating contact: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update contact")
+
+@router.get("/stats")
+async def get_contact_stats(db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Inbox counters for the unread badge, read from a single document
+    """
+    try:
+        stats = await db.counters.find_one({"_id": STATS_ID})
+        if stats is None or "reconciled_at" not in stats:
+            # Counters never counted from the data (e.g. first request after an upgrade):
+            # count once, then keep them incrementally
+            stats = await reconcile_stats(db)
+        return {"success": True, **{field: stats.get(field, 0) for field in STATS_FIELDS}}
+    except Exception as e:
+        logger.error(f"Error fetching contact stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch contact stats")
+
+@router.post("/bulk")
+async def bulk_contacts(
+    bulk: ContactBulkRequest,
+    current_user: str = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Mark read, archive or delete contacts given by id or by a filter (admin endpoint)
+    """
+    if (bulk.ids is None) == (bulk.filter is None):
+        raise HTTPException(status_code=400, detail="Pass either ids or filter")
+    if bulk.ids is not None:
+        if len(bulk.ids) > MAX_BULK_OPERATIONS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPERATIONS} ids per request")
+        selection = {"id": {"$in": bulk.ids}}
+    else:
+        selection = {}
+        if bulk.filter.older_than is not None:
+            older_than = bulk.filter.older_than
+            if older_than.tzinfo is not None:
+                # Timestamps are stored as naive UTC
+                older_than = older_than.astimezone(timezone.utc).replace(tzinfo=None)
+            selection["timestamp"] = {"$lt": older_than}
+        if bulk.filter.ip_address is not None:
+            selection["ip_address"] = bulk.filter.ip_address
+        if bulk.filter.email is not None:
+            selection["email"] = bulk.filter.email
+        if bulk.filter.unread is not None:
+            selection.update(UNREAD if bulk.filter.unread else READ)
+        if not selection:
+            # An empty filter would select every message
+            raise HTTPException(status_code=400, detail="Filter needs at least one condition")
+    try:
+        affected = await apply_action(db, selection, bulk.action)
+        logger.info(f"Bulk {bulk.action} of {affected} contacts by {current_user}")
+        return {"success": True, "action": bulk.action, "affected": affected}
+    except Exception as e:
+        logger.error(f"Error applying bulk contact {bulk.action}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to apply bulk contact action")
@@ -1,18 +1,57 @@
-from fastapi import APIRouter, HTTPException, Depends, Header
-from models_content import PersonalInfoUpdate, SkillUpdate, ProjectUpdate, CertificationUpdate, WebsiteSettings, ExperienceUpdate, EducationUpdate
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from fastapi import APIRouter, HTTPException, Depends, Query
+from models_content import PersonalInfoUpdate, SkillUpdate, ProjectUpdate, CertificationUpdate, WebsiteSettings, ExperienceUpdate, EducationUpdate, BulkRequest, PortfolioBundle, BUNDLE_VERSION
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from database import get_db
+from routes.auth import get_current_user
+from responses import FastJSONResponse
+from pymongo import ReturnDocument, InsertOne, UpdateOne, DeleteOne, DeleteMany
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from pydantic import ValidationError
+from search_index import SearchIndex
+import invalidation
+import resources
+import asyncio
+import time
 import logging
 from typing import List, Optional
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/content", tags=["content"])
 
-# Get database connection
-mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'portfolio_db')]
+# Sections whose changes are broadcast to every worker
+CONTENT_SECTIONS = ("personal_info", "skills", "projects", "certifications", "experience", "education", "settings")
+CONTENT_TOPIC = "content."
+# Items read per section when serving or indexing content
+CONTENT_MAX_ITEMS = resources.limit("CONTENT_MAX_ITEMS")
+
+# Callbacks notified with the sections whose content changed, in this or another worker
+_content_listeners = []
+
+def on_content_change(callback):
+    """Register an async callback(db, sections) to run after content mutations"""
+    _content_listeners.append(callback)
+    return callback
+
+async def content_changed(db: AsyncIOMotorDatabase, *sections: str):
+    """Notify listeners in every worker that content in the given sections changed"""
+    await invalidation.publish(db, *(CONTENT_TOPIC + section for section in sections))
+
+async def _dispatch_content_change(db: AsyncIOMotorDatabase, topics: List[str]):
+    sections = tuple(topic[len(CONTENT_TOPIC):] for topic in topics)
+    for callback in _content_listeners:
+        try:
+            await callback(db, sections)
+        except Exception as e:
+            logger.error(f"Content change listener failed: {str(e)}")
+
+for _section in CONTENT_SECTIONS:
+    invalidation.subscribe(CONTENT_TOPIC + _section, _dispatch_content_change)
+
+def ordered_items(items: List[dict]) -> List[dict]:
+    """Sort items by their persisted display order; unordered items keep insertion order at the end"""
+    return sorted(items, key=lambda item: (item.get("order") is None, item.get("order") or 0))
 
 # Default data to seed the database
 DEFAULT_PERSONAL_INFO = {
@@ -136,38 +175,67 @@ DEFAULT_EDUCATION = [
     }
 ]
 
+# Collections whose documents carry a sequential integer "id"
+ID_COLLECTIONS = ("projects", "experience", "education")
+
+_id_setup_lock = asyncio.Lock()
+_id_setup_done = False
+
+async def ensure_id_counters(db: AsyncIOMotorDatabase):
+    """Create unique id indexes and initialise counters from existing data (once per process)"""
+    global _id_setup_done
+    if _id_setup_done:
+        return
+    async with _id_setup_lock:
+        if _id_setup_done:
+            return
+        for name in ID_COLLECTIONS:
+            try:
+                await db[name].create_index("id", unique=True)
+            except DuplicateKeyError:
+                logger.error(f"Duplicate ids in {name}, unique index not created")
+            await sync_id_counter(db, name)
+        _id_setup_done = True
+
+async def sync_id_counter(db: AsyncIOMotorDatabase, collection: str):
+    """Raise the counter for a collection to at least its current highest id"""
+    max_doc = await db[collection].find_one({}, {"id": 1}, sort=[("id", -1)])
+    max_id = max_doc.get("id", 0) if max_doc else 0
+    # $max never moves the counter backwards, so concurrent syncs are harmless
+    await db.counters.update_one(
+        {"_id": collection},
+        {"$max": {"seq": max_id}},
+        upsert=True
+    )
+
+async def allocate_ids(db: AsyncIOMotorDatabase, collection: str, count: int = 1) -> int:
+    """
+    Atomically reserve `count` consecutive ids for a collection and return the first one
+    """
+    await ensure_id_counters(db)
+    counter = await db.counters.find_one_and_update(
+        {"_id": collection},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] - count + 1
+
 # Seed database endpoint
 @router.post("/seed")
-async def seed_database():
-    """Seed the database with default content"""
+async def seed_database(
+    force: bool = False,
+    current_user: str = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Seed the database with default content (pass force=true to reseed a populated database)"""
     try:
         # Check if already seeded
         existing = await db.personal_info.find_one()
-        if existing:
+        if existing and not force:
             return {"success": True, "message": "Database already seeded"}
         
-        # Seed personal info
-        await db.personal_info.insert_one(DEFAULT_PERSONAL_INFO.copy())
-        
-        # Seed skills
-        await db.skills.delete_many({})
-        await db.skills.insert_many([s.copy() for s in DEFAULT_SKILLS])
-        
-        # Seed projects
-        await db.projects.delete_many({})
-        await db.projects.insert_many([p.copy() for p in DEFAULT_PROJECTS])
-        
-        # Seed certifications
-        await db.certifications.delete_many({})
-        await db.certifications.insert_many([c.copy() for c in DEFAULT_CERTIFICATIONS])
-        
-        # Seed experience
-        await db.experience.delete_many({})
-        await db.experience.insert_many([e.copy() for e in DEFAULT_EXPERIENCE])
-        
-        # Seed education
-        await db.education.delete_many({})
-        await db.education.insert_many([e.copy() for e in DEFAULT_EDUCATION])
+        await load_bundle(db, default_bundle())
         
         logger.info("Database seeded successfully")
         return {"success": True, "message": "Database seeded with default content"}
@@ -175,36 +243,86 @@ async def seed_database():
         logger.error(f"Error seeding database: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to seed database: {str(e)}")
 
+# Sections served by /content/all, with the defaults used while a section is empty
+CONTENT_DEFAULTS = {
+    "personal_info": DEFAULT_PERSONAL_INFO,
+    "skills": DEFAULT_SKILLS,
+    "projects": DEFAULT_PROJECTS,
+    "certifications": DEFAULT_CERTIFICATIONS,
+    "experience": DEFAULT_EXPERIENCE,
+    "education": DEFAULT_EDUCATION,
+}
+
+def parse_sections(sections: Optional[str]) -> List[str]:
+    """Parse a comma-separated ?sections= value, defaulting to every section"""
+    if not sections:
+        return list(CONTENT_DEFAULTS)
+    wanted = [s.strip() for s in sections.split(",") if s.strip()]
+    unknown = [s for s in wanted if s not in CONTENT_DEFAULTS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown sections: {', '.join(unknown)}")
+    return wanted
+
+def parse_fields(fields: Optional[str], section: str) -> Optional[List[str]]:
+    """
+    Fields from a comma-separated ?fields= value that apply to a section.
+    Bare names apply to every section, "section.field" only to that section.
+    """
+    if not fields:
+        return None
+    selected = []
+    for entry in (f.strip() for f in fields.split(",")):
+        if not entry:
+            continue
+        prefix, _, name = entry.rpartition(".")
+        if prefix in ("", section):
+            selected.append(name)
+    return selected or None
+
+def select_fields(items, field_list: Optional[List[str]]):
+    """Slice a document (or list of documents) down to the selected fields"""
+    if field_list is None or items is None:
+        return items
+    if isinstance(items, list):
+        return [{k: item[k] for k in field_list if k in item} for item in items]
+    return {k: items[k] for k in field_list if k in items}
+
+async def read_section(db: AsyncIOMotorDatabase, section: str, field_list: Optional[List[str]] = None):
+    """Read a section with a Mongo projection limited to the selected fields"""
+    projection = {"_id": 0}
+    if field_list is not None:
+        projection.update({f: 1 for f in field_list})
+    if section == "personal_info":
+        return await db.personal_info.find_one({}, projection)
+    if field_list is not None:
+        # Needed for sorting, stripped again below
+        projection["order"] = 1
+    items = ordered_items(await db[section].find({}, projection).to_list(CONTENT_MAX_ITEMS))
+    return select_fields(items, field_list)
+
 # Get all content at once
 @router.get("/all")
-async def get_all_content():
-    """Get all content for the portfolio"""
+async def get_all_content(sections: Optional[str] = None, fields: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Get all content for the portfolio (optionally limited with ?sections= and ?fields=)"""
+    wanted = parse_sections(sections)
     try:
-        personal_info = await db.personal_info.find_one({}, {"_id": 0})
-        skills = await db.skills.find({}, {"_id": 0}).to_list(100)
-        projects = await db.projects.find({}, {"_id": 0}).to_list(100)
-        certifications = await db.certifications.find({}, {"_id": 0}).to_list(100)
-        experience = await db.experience.find({}, {"_id": 0}).to_list(100)
-        education = await db.education.find({}, {"_id": 0}).to_list(100)
-        
-        return {
-            "personal_info": personal_info or DEFAULT_PERSONAL_INFO,
-            "skills": skills if skills else DEFAULT_SKILLS,
-            "projects": projects if projects else DEFAULT_PROJECTS,
-            "certifications": certifications if certifications else DEFAULT_CERTIFICATIONS,
-            "experience": experience if experience else DEFAULT_EXPERIENCE,
-            "education": education if education else DEFAULT_EDUCATION
-        }
+        content = {}
+        for section in wanted:
+            field_list = parse_fields(fields, section)
+            data = await read_section(db, section, field_list)
+            content[section] = data if data else select_fields(CONTENT_DEFAULTS[section], field_list)
+        # Plain Mongo documents: encode directly instead of walking them with jsonable_encoder
+        return FastJSONResponse(content)
     except Exception as e:
         logger.error(f"Error fetching all content: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch content")
 
 # Personal Info
 @router.get("/personal-info")
-async def get_personal_info():
+async def get_personal_info(fields: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get current personal information"""
     try:
-        info = await db.personal_info.find_one({}, {"_id": 0})
+        info = await read_section(db, "personal_info", parse_fields(fields, "personal_info"))
         if not info:
             return {"message": "No data found"}
         return info
@@ -213,7 +331,7 @@ async def get_personal_info():
         raise HTTPException(status_code=500, detail="Failed to fetch personal info")
 
 @router.put("/personal-info")
-async def update_personal_info(data: PersonalInfoUpdate):
+async def update_personal_info(data: PersonalInfoUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Update personal information"""
     try:
         update_data = {k: v for k, v in data.dict().items() if v is not None}
@@ -225,6 +343,7 @@ async def update_personal_info(data: PersonalInfoUpdate):
             {"$set": update_data},
             upsert=True
         )
+        await content_changed(db, "personal_info")
         return {"success": True, "message": "Personal info updated successfully"}
     except Exception as e:
         logger.error(f"Error updating personal info: {str(e)}")
@@ -232,27 +351,28 @@ async def update_personal_info(data: PersonalInfoUpdate):
 
 # Skills
 @router.get("/skills")
-async def get_skills():
+async def get_skills(fields: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get all skills"""
     try:
-        skills = await db.skills.find({}, {"_id": 0}).to_list(100)
+        skills = await read_section(db, "skills", parse_fields(fields, "skills"))
         return {"skills": skills}
     except Exception as e:
         logger.error(f"Error fetching skills: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch skills")
 
 @router.post("/skills")
-async def add_skill(skill: SkillUpdate):
+async def add_skill(skill: SkillUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Add a new skill"""
     try:
         await db.skills.insert_one(skill.dict())
+        await content_changed(db, "skills")
         return {"success": True, "message": "Skill added successfully"}
     except Exception as e:
         logger.error(f"Error adding skill: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to add skill")
 
 @router.put("/skills/{category}")
-async def update_skill(category: str, skill: SkillUpdate):
+async def update_skill(category: str, skill: SkillUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Update a skill"""
     try:
         result = await db.skills.update_one(
@@ -261,18 +381,20 @@ async def update_skill(category: str, skill: SkillUpdate):
         )
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Skill not found")
+        await content_changed(db, "skills")
         return {"success": True, "message": "Skill updated successfully"}
     except Exception as e:
         logger.error(f"Error updating skill: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update skill")
 
 @router.delete("/skills/{category}")
-async def delete_skill(category: str):
+async def delete_skill(category: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Delete a skill"""
     try:
         result = await db.skills.delete_one({"category": category})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Skill not found")
+        await content_changed(db, "skills")
         return {"success": True, "message": "Skill deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting skill: {str(e)}")
@@ -280,32 +402,31 @@ async def delete_skill(category: str):
 
 # Projects
 @router.get("/projects")
-async def get_projects():
+async def get_projects(fields: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get all projects"""
     try:
-        projects = await db.projects.find({}, {"_id": 0}).to_list(100)
+        projects = await read_section(db, "projects", parse_fields(fields, "projects"))
         return {"projects": projects}
     except Exception as e:
         logger.error(f"Error fetching projects: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch projects")
 
 @router.post("/projects")
-async def add_project(project: ProjectUpdate):
+async def add_project(project: ProjectUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Add a new project"""
     try:
         project_dict = project.dict()
-        # Generate new ID
-        max_project = await db.projects.find_one(sort=[("id", -1)])
-        project_dict['id'] = (max_project.get('id', 0) + 1) if max_project else 1
+        project_dict['id'] = await allocate_ids(db, "projects")
         
         await db.projects.insert_one(project_dict)
+        await content_changed(db, "projects")
         return {"success": True, "message": "Project added successfully", "id": project_dict['id']}
     except Exception as e:
         logger.error(f"Error adding project: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to add project")
 
 @router.put("/projects/{project_id}")
-async def update_project(project_id: int, project: ProjectUpdate):
+async def update_project(project_id: int, project: ProjectUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Update a project"""
     try:
         result = await db.projects.update_one(
@@ -314,18 +435,20 @@ async def update_project(project_id: int, project: ProjectUpdate):
         )
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
+        await content_changed(db, "projects")
         return {"success": True, "message": "Project updated successfully"}
     except Exception as e:
         logger.error(f"Error updating project: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update project")
 
 @router.delete("/projects/{project_id}")
-async def delete_project(project_id: int):
+async def delete_project(project_id: int, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Delete a project"""
     try:
         result = await db.projects.delete_one({"id": project_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
+        await content_changed(db, "projects")
         return {"success": True, "message": "Project deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting project: {str(e)}")
@@ -333,32 +456,34 @@ async def delete_project(project_id: int):
 
 # Certifications
 @router.get("/certifications")
-async def get_certifications():
+async def get_certifications(fields: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get all certifications"""
     try:
-        certs = await db.certifications.find({}, {"_id": 0}).to_list(100)
+        certs = await read_section(db, "certifications", parse_fields(fields, "certifications"))
         return {"certifications": certs}
     except Exception as e:
         logger.error(f"Error fetching certifications: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch certifications")
 
 @router.post("/certifications")
-async def add_certification(cert: CertificationUpdate):
+async def add_certification(cert: CertificationUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Add a new certification"""
     try:
         await db.certifications.insert_one(cert.dict())
+        await content_changed(db, "certifications")
         return {"success": True, "message": "Certification added successfully"}
     except Exception as e:
         logger.error(f"Error adding certification: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to add certification")
 
 @router.delete("/certifications/{cert_name}")
-async def delete_certification(cert_name: str):
+async def delete_certification(cert_name: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Delete a certification"""
     try:
         result = await db.certifications.delete_one({"name": cert_name})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Certification not found")
+        await content_changed(db, "certifications")
         return {"success": True, "message": "Certification deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting certification: {str(e)}")
@@ -366,7 +491,7 @@ async def delete_certification(cert_name: str):
 
 # Website Settings
 @router.get("/settings")
-async def get_settings():
+async def get_settings(db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get website settings"""
     try:
         settings = await db.settings.find_one({}, {"_id": 0})
@@ -383,7 +508,7 @@ async def get_settings():
         raise HTTPException(status_code=500, detail="Failed to fetch settings")
 
 @router.put("/settings")
-async def update_settings(settings: WebsiteSettings):
+async def update_settings(settings: WebsiteSettings, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Update website settings"""
     try:
         update_data = {k: v for k, v in settings.dict().items() if v is not None}
@@ -392,6 +517,7 @@ async def update_settings(settings: WebsiteSettings):
             {"$set": update_data},
             upsert=True
         )
+        await content_changed(db, "settings")
         return {"success": True, "message": "Settings updated successfully"}
     except Exception as e:
         logger.error(f"Error updating settings: {str(e)}")
@@ -399,30 +525,31 @@ async def update_settings(settings: WebsiteSettings):
 
 # Experience
 @router.get("/experience")
-async def get_experience():
+async def get_experience(fields: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get all experience"""
     try:
-        experience = await db.experience.find({}, {"_id": 0}).to_list(100)
-        return {"experience": experience if experience else DEFAULT_EXPERIENCE}
+        field_list = parse_fields(fields, "experience")
+        experience = await read_section(db, "experience", field_list)
+        return {"experience": experience if experience else select_fields(DEFAULT_EXPERIENCE, field_list)}
     except Exception as e:
         logger.error(f"Error fetching experience: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch experience")
 
 @router.post("/experience")
-async def add_experience(exp: ExperienceUpdate):
+async def add_experience(exp: ExperienceUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Add a new experience"""
     try:
         exp_dict = exp.dict()
-        max_exp = await db.experience.find_one(sort=[("id", -1)])
-        exp_dict['id'] = (max_exp.get('id', 0) + 1) if max_exp else 1
+        exp_dict['id'] = await allocate_ids(db, "experience")
         await db.experience.insert_one(exp_dict)
+        await content_changed(db, "experience")
         return {"success": True, "message": "Experience added successfully", "id": exp_dict['id']}
     except Exception as e:
         logger.error(f"Error adding experience: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to add experience")
 
 @router.put("/experience/{exp_id}")
-async def update_experience(exp_id: int, exp: ExperienceUpdate):
+async def update_experience(exp_id: int, exp: ExperienceUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Update experience"""
     try:
         result = await db.experience.update_one(
@@ -431,18 +558,20 @@ async def update_experience(exp_id: int, exp: ExperienceUpdate):
         )
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Experience not found")
+        await content_changed(db, "experience")
         return {"success": True, "message": "Experience updated successfully"}
     except Exception as e:
         logger.error(f"Error updating experience: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update experience")
 
 @router.delete("/experience/{exp_id}")
-async def delete_experience(exp_id: int):
+async def delete_experience(exp_id: int, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Delete experience"""
     try:
         result = await db.experience.delete_one({"id": exp_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Experience not found")
+        await content_changed(db, "experience")
         return {"success": True, "message": "Experience deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting experience: {str(e)}")
@@ -450,30 +579,31 @@ async def delete_experience(exp_id: int):
 
 # Education
 @router.get("/education")
-async def get_education():
+async def get_education(fields: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get all education"""
     try:
-        education = await db.education.find({}, {"_id": 0}).to_list(100)
-        return {"education": education if education else DEFAULT_EDUCATION}
+        field_list = parse_fields(fields, "education")
+        education = await read_section(db, "education", field_list)
+        return {"education": education if education else select_fields(DEFAULT_EDUCATION, field_list)}
     except Exception as e:
         logger.error(f"Error fetching education: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch education")
 
 @router.post("/education")
-async def add_education(edu: EducationUpdate):
+async def add_education(edu: EducationUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Add a new education"""
     try:
         edu_dict = edu.dict()
-        max_edu = await db.education.find_one(sort=[("id", -1)])
-        edu_dict['id'] = (max_edu.get('id', 0) + 1) if max_edu else 1
+        edu_dict['id'] = await allocate_ids(db, "education")
         await db.education.insert_one(edu_dict)
+        await content_changed(db, "education")
         return {"success": True, "message": "Education added successfully", "id": edu_dict['id']}
     except Exception as e:
         logger.error(f"Error adding education: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to add education")
 
 @router.put("/education/{edu_id}")
-async def update_education(edu_id: int, edu: EducationUpdate):
+async def update_education(edu_id: int, edu: EducationUpdate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Update education"""
     try:
         result = await db.education.update_one(
@@ -482,19 +612,467 @@ async def update_education(edu_id: int, edu: EducationUpdate):
         )
         if result.modified_count == 0:
             raise HTTPException(status_code=404, detail="Education not found")
+        await content_changed(db, "education")
         return {"success": True, "message": "Education updated successfully"}
     except Exception as e:
         logger.error(f"Error updating education: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update education")
 
 @router.delete("/education/{edu_id}")
-async def delete_education(edu_id: int):
+async def delete_education(edu_id: int, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Delete education"""
     try:
         result = await db.education.delete_one({"id": edu_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Education not found")
+        await content_changed(db, "education")
         return {"success": True, "message": "Education deleted successfully"}
     except Exception as e:
         logger.error(f"Error deleting education: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to delete education")
+
+# Bulk editing
+BULK_SECTIONS = {
+    "skills": {"model": SkillUpdate, "key": "category"},
+    "projects": {"model": ProjectUpdate, "key": "id"},
+    "certifications": {"model": CertificationUpdate, "key": "name"},
+    "experience": {"model": ExperienceUpdate, "key": "id"},
+    "education": {"model": EducationUpdate, "key": "id"},
+}
+MAX_BULK_OPERATIONS = resources.limit("MAX_BULK_OPERATIONS")
+
+def _bulk_key(section: str, key):
+    """Normalise an operation key to the type stored for the section"""
+    if key is None:
+        raise ValueError("key is required")
+    if section in ID_COLLECTIONS:
+        return int(key)
+    return str(key)
+
+@router.post("/{section}/bulk")
+async def bulk_update_section(
+    section: str,
+    bulk: BulkRequest,
+    current_user: str = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Apply create, update, delete and reorder operations to a section in a single bulk write.
+    In ordered mode (the default) the first failing operation stops the ones after it.
+    """
+    config = BULK_SECTIONS.get(section)
+    if not config:
+        raise HTTPException(status_code=404, detail=f"Unknown section: {section}")
+    if len(bulk.operations) > MAX_BULK_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPERATIONS} operations per request")
+    
+    model, key_field = config["model"], config["key"]
+    collection = db[section]
+    try:
+        # One read to learn which keys exist, one counter bump for all new ids
+        display = None
+        if any(operation.op == "reorder" for operation in bulk.operations):
+            # Reordering renumbers the whole section, so read every key in display order
+            existing = ordered_items(await collection.find({}, {"_id": 0, key_field: 1, "order": 1}).to_list(None))
+            display = [doc[key_field] for doc in existing]
+        else:
+            referenced = set()
+            for operation in bulk.operations:
+                try:
+                    if operation.op in ("update", "delete"):
+                        referenced.add(_bulk_key(section, operation.key))
+                except ValueError:
+                    pass
+            existing = await collection.find(
+                {key_field: {"$in": list(referenced)}}, {"_id": 0, key_field: 1}
+            ).to_list(None) if referenced else []
+        known_keys = {doc[key_field] for doc in existing}
+        
+        creates = sum(1 for operation in bulk.operations if operation.op == "create")
+        next_id = await allocate_ids(db, section, creates) if creates and section in ID_COLLECTIONS else None
+        
+        results = []
+        write_requests = []
+        request_owner = []  # request index -> operation index
+        for index, operation in enumerate(bulk.operations):
+            result = {"index": index, "op": operation.op, "status": "ok"}
+            results.append(result)
+            try:
+                if operation.op == "create":
+                    item = model(**(operation.data or {})).dict()
+                    if next_id is not None:
+                        item["id"] = next_id
+                        next_id += 1
+                    known_keys.add(item[key_field])
+                    if display is not None:
+                        display.append(item[key_field])
+                    result["key"] = item[key_field]
+                    ops = [InsertOne(item)]
+                elif operation.op == "update":
+                    key = _bulk_key(section, operation.key)
+                    result["key"] = key
+                    if key not in known_keys:
+                        raise LookupError("not found")
+                    item = model(**(operation.data or {})).dict(exclude={"id"})
+                    ops = [UpdateOne({key_field: key}, {"$set": item})]
+                    if key_field in item and item[key_field] != key:
+                        known_keys.discard(key)
+                        known_keys.add(item[key_field])
+                        if display is not None:
+                            display[display.index(key)] = item[key_field]
+                elif operation.op == "delete":
+                    key = _bulk_key(section, operation.key)
+                    result["key"] = key
+                    if key not in known_keys:
+                        raise LookupError("not found")
+                    known_keys.discard(key)
+                    if display is not None:
+                        display.remove(key)
+                    ops = [DeleteOne({key_field: key})]
+                else:
+                    keys = [_bulk_key(section, k) for k in operation.order or []]
+                    missing = [k for k in keys if k not in known_keys]
+                    if missing:
+                        raise LookupError(f"not found: {missing}")
+                    if len(set(keys)) != len(keys):
+                        raise ValueError("order lists a key more than once")
+                    # Items left out keep their relative order after the listed ones
+                    listed = set(keys)
+                    display = keys + [k for k in display if k not in listed]
+                    ops = [UpdateOne({key_field: k}, {"$set": {"order": position}}) for position, k in enumerate(display)]
+            except (ValidationError, ValueError, LookupError) as e:
+                result["status"] = "error"
+                result["error"] = str(e)
+                if bulk.ordered:
+                    results.extend(
+                        {"index": later, "op": bulk.operations[later].op, "status": "skipped"}
+                        for later in range(index + 1, len(bulk.operations))
+                    )
+                    break
+                continue
+            write_requests.extend(ops)
+            request_owner.extend([index] * len(ops))
+        
+        counts = {"inserted": 0, "modified": 0, "deleted": 0}
+        if write_requests:
+            try:
+                write = await collection.bulk_write(write_requests, ordered=bulk.ordered)
+                details = {
+                    "nInserted": write.inserted_count,
+                    "nModified": write.modified_count,
+                    "nRemoved": write.deleted_count,
+                    "writeErrors": [],
+                }
+            except BulkWriteError as e:
+                details = e.details
+            counts = {
+                "inserted": details.get("nInserted", 0),
+                "modified": details.get("nModified", 0),
+                "deleted": details.get("nRemoved", 0),
+            }
+            write_errors = details.get("writeErrors", [])
+            for error in write_errors:
+                failed = results[request_owner[error["index"]]]
+                failed["status"] = "error"
+                failed["error"] = error.get("errmsg", "write failed")
+            if write_errors and bulk.ordered:
+                # An ordered bulk write stops at the first error
+                first_failed = write_errors[0]["index"]
+                for owner in set(request_owner[first_failed + 1:]):
+                    if results[owner]["status"] == "ok":
+                        results[owner]["status"] = "skipped"
+        
+        if counts["inserted"] or counts["modified"] or counts["deleted"]:
+            await content_changed(db, section)
+        
+        return {
+            "success": all(r["status"] == "ok" for r in results),
+            "results": results,
+            **counts
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error applying bulk {section} operations: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to apply bulk {section} operations")
+
+# Bundle import/export
+# Singleton sections hold one document; list sections are keyed like the bulk API
+BUNDLE_SINGLETONS = {"personal_info": PersonalInfoUpdate, "settings": WebsiteSettings}
+
+def default_bundle() -> PortfolioBundle:
+    """Bundle holding the built-in default content"""
+    return PortfolioBundle(
+        personal_info=DEFAULT_PERSONAL_INFO,
+        skills=DEFAULT_SKILLS,
+        projects=DEFAULT_PROJECTS,
+        certifications=DEFAULT_CERTIFICATIONS,
+        experience=DEFAULT_EXPERIENCE,
+        education=DEFAULT_EDUCATION,
+    )
+
+def _bundle_sections(bundle: PortfolioBundle) -> List[str]:
+    """Sections present in a bundle"""
+    return [name for name in (*BUNDLE_SINGLETONS, *BULK_SECTIONS) if getattr(bundle, name) is not None]
+
+async def export_bundle(db: AsyncIOMotorDatabase) -> dict:
+    """Read every section into a bundle document"""
+    bundle = {"version": BUNDLE_VERSION, "exported_at": datetime.utcnow()}
+    for name in BUNDLE_SINGLETONS:
+        bundle[name] = await db[name].find_one({}, {"_id": 0})
+    for name in BULK_SECTIONS:
+        items = ordered_items(await db[name].find({}, {"_id": 0}).to_list(None))
+        # Display order is carried by list position
+        bundle[name] = [{k: v for k, v in item.items() if k != "order"} for item in items]
+    return bundle
+
+async def diff_bundle(db: AsyncIOMotorDatabase, bundle: PortfolioBundle) -> dict:
+    """Describe what importing a bundle would change, section by section"""
+    diff = {}
+    for name in _bundle_sections(bundle):
+        try:
+            diff[name] = await _diff_section(db, bundle, name)
+        except ValidationError as e:
+            # Stored data from an older schema; the import replaces it regardless
+            diff[name] = {"error": f"stored {name} does not match the current schema: {e.error_count()} validation error(s)"}
+    return diff
+
+async def _diff_section(db: AsyncIOMotorDatabase, bundle: PortfolioBundle, name: str) -> dict:
+    """What importing a bundle would change in one section"""
+    if name in BUNDLE_SINGLETONS:
+        model = BUNDLE_SINGLETONS[name]
+        current = await db[name].find_one({}, {"_id": 0}) or {}
+        current = model(**current).model_dump(exclude_none=True)
+        incoming = getattr(bundle, name).model_dump(exclude_none=True)
+        changed = sorted(k for k in current.keys() | incoming.keys() if current.get(k) != incoming.get(k))
+        return {"changed_fields": changed}
+    
+    model, key_field = BULK_SECTIONS[name]["model"], BULK_SECTIONS[name]["key"]
+    current_items = ordered_items(await db[name].find({}, {"_id": 0}).to_list(None))
+    current = {item.get(key_field): model(**item).model_dump() for item in current_items}
+    incoming = [item.model_dump() for item in getattr(bundle, name)]
+    incoming_keys = [item.get(key_field) for item in incoming]
+    
+    added = [item.get(key_field) for item in incoming if item.get(key_field) is None or item.get(key_field) not in current]
+    changed = [item[key_field] for item in incoming if item.get(key_field) in current and current[item[key_field]] != item]
+    removed = [key for key in current if key not in incoming_keys]
+    kept = [key for key in incoming_keys if key in current]
+    return {
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+        "unchanged": len(kept) - len(changed),
+        "reordered": kept != [key for key in current if key in kept],
+    }
+
+def validate_bundle(bundle: PortfolioBundle) -> List[str]:
+    """Problems that would make an import fail partway, found before anything is written"""
+    problems = []
+    for name in _bundle_sections(bundle):
+        if name in BUNDLE_SINGLETONS:
+            continue
+        key_field = BULK_SECTIONS[name]["key"]
+        seen, duplicates = set(), []
+        for item in getattr(bundle, name):
+            key = getattr(item, key_field)
+            # Missing ids are allocated on import
+            if key is None:
+                continue
+            if key in seen and key not in duplicates:
+                duplicates.append(key)
+            seen.add(key)
+        if duplicates:
+            problems.append(f"{name}: duplicate {key_field} {', '.join(str(key) for key in duplicates)}")
+    return problems
+
+async def _supports_transactions(db: AsyncIOMotorDatabase) -> bool:
+    """Transactions need a replica set member or mongos"""
+    hello = await db.command("hello")
+    return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+# Without transactions, sections are written here first and renamed over the live collections
+STAGING_SUFFIX = "__import"
+
+async def _stage_and_swap(db: AsyncIOMotorDatabase, docs: dict):
+    """Replace collections without a transaction: nothing live changes until every section is staged"""
+    try:
+        for name, items in docs.items():
+            staging = db[name + STAGING_SUFFIX]
+            await staging.drop()
+            if name in ID_COLLECTIONS:
+                await staging.create_index("id", unique=True)
+            if items:
+                await staging.insert_many(items, ordered=True)
+    except Exception:
+        for name in docs:
+            await db[name + STAGING_SUFFIX].drop()
+        raise
+    for name, items in docs.items():
+        if items:
+            # Each rename swaps one section in atomically, taking the staged indexes along
+            await db[name + STAGING_SUFFIX].rename(name, dropTarget=True)
+        else:
+            await db[name].delete_many({})
+
+async def load_bundle(db: AsyncIOMotorDatabase, bundle: PortfolioBundle) -> List[str]:
+    """Replace the sections present in a bundle, all at once or not at all"""
+    problems = validate_bundle(bundle)
+    if problems:
+        raise ValueError("; ".join(problems))
+    sections = _bundle_sections(bundle)
+    docs = {}
+    for name in sections:
+        if name in BUNDLE_SINGLETONS:
+            docs[name] = [getattr(bundle, name).model_dump(exclude_none=True)]
+            continue
+        items = [item.model_dump() for item in getattr(bundle, name)]
+        if name in ID_COLLECTIONS:
+            missing = [item for item in items if item.get("id") is None]
+            if missing:
+                # Allocate past the bundle's own ids so they cannot collide
+                highest = max((item["id"] for item in items if item.get("id") is not None), default=0)
+                await db.counters.update_one({"_id": name}, {"$max": {"seq": highest}}, upsert=True)
+                next_id = await allocate_ids(db, name, len(missing))
+                for offset, item in enumerate(missing):
+                    item["id"] = next_id + offset
+        for position, item in enumerate(items):
+            item["order"] = position
+        docs[name] = items
+    
+    if await _supports_transactions(db):
+        async with await db.client.start_session() as session:
+            async with session.start_transaction():
+                for name, items in docs.items():
+                    ops = [DeleteMany({})] + [InsertOne(item) for item in items]
+                    await db[name].bulk_write(ops, ordered=True, session=session)
+    else:
+        await _stage_and_swap(db, docs)
+    
+    # Keep id counters ahead of the imported ids
+    for name in ID_COLLECTIONS:
+        if name in docs:
+            await sync_id_counter(db, name)
+    
+    await content_changed(db, *sections)
+    return sections
+
+@router.get("/export")
+async def export_content(current_user: str = Depends(get_current_user), db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Export the whole portfolio as a versioned bundle file"""
+    try:
+        bundle = await export_bundle(db)
+        filename = f"portfolio-bundle-{bundle['exported_at']:%Y%m%d-%H%M%S}.json"
+        return FastJSONResponse(
+            content=PortfolioBundle(**bundle).model_dump(exclude_none=True),
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+    except Exception as e:
+        logger.error(f"Error exporting content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to export content")
+
+@router.post("/import")
+async def import_content(
+    bundle: PortfolioBundle,
+    dry_run: bool = False,
+    current_user: str = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Import a portfolio bundle, replacing the sections it contains (dry_run=true only reports the diff)
+    """
+    if bundle.version > BUNDLE_VERSION:
+        raise HTTPException(status_code=400, detail=f"Unsupported bundle version: {bundle.version}")
+    problems = validate_bundle(bundle)
+    if problems:
+        raise HTTPException(status_code=422, detail=problems)
+    try:
+        diff = await diff_bundle(db, bundle)
+        if dry_run:
+            return {"success": True, "dry_run": True, "diff": diff}
+        
+        sections = await load_bundle(db, bundle)
+        logger.info(f"Imported portfolio bundle: {', '.join(sections)}")
+        return {"success": True, "dry_run": False, "diff": diff, "imported": sections}
+    except Exception as e:
+        logger.error(f"Error importing content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import content")
+
+# Search
+# Indexed fields per section with their ranking weights
+SEARCH_SECTIONS = {
+    "projects": {
+        "key": "id",
+        "default": DEFAULT_PROJECTS,
+        "fields": {"title": 3.0, "technologies": 2.0, "category": 1.5, "description": 1.0, "highlights": 1.0},
+    },
+    "certifications": {
+        "key": "name",
+        "default": DEFAULT_CERTIFICATIONS,
+        "fields": {"name": 3.0, "issuer": 2.0},
+    },
+    "experience": {
+        "key": "id",
+        "default": DEFAULT_EXPERIENCE,
+        "fields": {"title": 3.0, "company": 2.0, "description": 1.0, "achievements": 1.0},
+    },
+}
+
+search_index = SearchIndex()
+resources.register_usage("search_index", lambda: search_index, CONTENT_MAX_ITEMS * len(SEARCH_SECTIONS))
+_search_lock = asyncio.Lock()
+_search_ready = False
+
+async def refresh_search_section(db: AsyncIOMotorDatabase, section: str):
+    """Re-index one section from the database"""
+    config = SEARCH_SECTIONS[section]
+    items = await db[section].find({}, {"_id": 0}).to_list(CONTENT_MAX_ITEMS)
+    # Mirror /content/all, which serves defaults for empty sections
+    items = items or config["default"]
+    search_index.replace_section(section, [
+        (
+            item.get(config["key"]),
+            {field: (item.get(field), weight) for field, weight in config["fields"].items()},
+            item,
+        )
+        for item in items
+    ])
+
+async def ensure_search_index(db: AsyncIOMotorDatabase):
+    """Build the search index on first use"""
+    global _search_ready
+    if _search_ready:
+        return
+    async with _search_lock:
+        if _search_ready:
+            return
+        for section in SEARCH_SECTIONS:
+            await refresh_search_section(db, section)
+        _search_ready = True
+
+@on_content_change
+async def _refresh_search(db: AsyncIOMotorDatabase, sections):
+    """Re-index only the searchable sections that changed"""
+    if not _search_ready:
+        return
+    for section in sections:
+        if section in SEARCH_SECTIONS:
+            await refresh_search_section(db, section)
+
+@router.get("/search")
+async def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=10, ge=1, le=50),
+    sections: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Full-text search over projects, certifications and experience"""
+    try:
+        await ensure_search_index(db)
+        wanted = [s for s in sections.split(",") if s] if sections else None
+        started = time.perf_counter()
+        results = search_index.search(q, limit=limit, sections=wanted)
+        took_ms = (time.perf_counter() - started) * 1000
+        return FastJSONResponse({"query": q, "results": results, "took_ms": round(took_ms, 3)})
+    except Exception as e:
+        logger.error(f"Error searching content: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search content")
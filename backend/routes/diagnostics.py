@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, Query, HTTPException, Path
+from fastapi.responses import FileResponse
+from routes.auth import get_current_user
+from responses import FastJSONResponse
+from typing import Optional
+import slowlog
+import profiler
+import resources
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+@router.get("/slow-log")
+async def get_slow_log(
+    limit: int = Query(default=100, ge=1, le=1000),
+    kind: Optional[str] = Query(default=None, pattern="^(request|query)$"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Recent slow requests and MongoDB commands, newest first (admin endpoint)
+    """
+    # Explain plans can hold raw BSON values, which the fast encoder handles
+    return FastJSONResponse({
+        "thresholds": {"request_ms": slowlog.SLOW_REQUEST_MS, "query_ms": slowlog.SLOW_QUERY_MS},
+        "capacity": slowlog.entries.maxlen,
+        "entries": slowlog.snapshot(limit=limit, kind=kind)
+    })
+
+@router.delete("/slow-log")
+async def clear_slow_log(current_user: str = Depends(get_current_user)):
+    """
+    Empty the slow log (admin endpoint)
+    """
+    slowlog.entries.clear()
+    logger.info(f"Slow log cleared by {current_user}")
+    return {"success": True}
+
+@router.get("/profiles")
+async def get_profiles(current_user: str = Depends(get_current_user)):
+    """
+    Stored request profiles, newest first (admin endpoint)
+    """
+    return FastJSONResponse({"profiles": profiler.list_profiles()})
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str = Path(..., pattern=r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{8}$"),
+    current_user: str = Depends(get_current_user)
+):
+    """
+    Download a profile: folded stacks for flamegraph.pl/speedscope or pstats for snakeviz (admin endpoint)
+    """
+    path = profiler.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=path.name, media_type="application/octet-stream")
+
+@router.get("/memory")
+async def get_memory(current_user: str = Depends(get_current_user)):
+    """
+    Process memory and the estimated size of each bounded structure (admin endpoint)
+    """
+    return FastJSONResponse(resources.report())
@@ -0,0 +1,107 @@
+import bisect
+import math
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# In-memory inverted index for portfolio content search
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Score multiplier for terms matched by prefix rather than exactly
+PREFIX_WEIGHT = 0.7
+
+def tokenize(text) -> List[str]:
+    """Lowercase and split text (or a list of strings) into alphanumeric tokens"""
+    if text is None:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = " ".join(str(t) for t in text)
+    return TOKEN_RE.findall(str(text).lower())
+
+class SearchIndex:
+    """
+    Inverted index with prefix matching and BM25 ranking.
+    Documents are keyed by (section, key) and carry per-field weights.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[Tuple[str, object], dict] = {}
+        self._postings: Dict[str, Dict[Tuple[str, object], float]] = defaultdict(dict)
+        self._vocabulary: List[str] = []
+        self._total_length = 0.0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, section: str, key, fields: Dict[str, Tuple[object, float]], item: dict):
+        """Index a document; fields maps field name to (text, weight)"""
+        doc_id = (section, key)
+        self.remove(section, key)
+        frequencies: Dict[str, float] = defaultdict(float)
+        for text, weight in fields.values():
+            for token in tokenize(text):
+                frequencies[token] += weight
+        length = sum(frequencies.values())
+        for term, tf in frequencies.items():
+            if term not in self._postings:
+                bisect.insort(self._vocabulary, term)
+            self._postings[term][doc_id] = tf
+        self._docs[doc_id] = {"terms": list(frequencies), "length": length, "item": item}
+        self._total_length += length
+
+    def remove(self, section: str, key):
+        """Drop a document from the index if present"""
+        doc = self._docs.pop((section, key), None)
+        if not doc:
+            return
+        self._total_length -= doc["length"]
+        for term in doc["terms"]:
+            postings = self._postings[term]
+            postings.pop((section, key), None)
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._vocabulary, term)
+                if index < len(self._vocabulary) and self._vocabulary[index] == term:
+                    self._vocabulary.pop(index)
+
+    def replace_section(self, section: str, docs: List[Tuple[object, Dict[str, Tuple[object, float]], dict]]):
+        """Replace every document of a section with (key, fields, item) tuples"""
+        for doc_section, key in [doc_id for doc_id in self._docs if doc_id[0] == section]:
+            self.remove(doc_section, key)
+        for key, fields, item in docs:
+            self.add(section, key, fields, item)
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Vocabulary terms matching a query token exactly or by prefix"""
+        matches = []
+        index = bisect.bisect_left(self._vocabulary, token)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(token):
+            term = self._vocabulary[index]
+            matches.append((term, 1.0 if term == token else PREFIX_WEIGHT))
+            index += 1
+        return matches
+
+    def search(self, query: str, limit: int = 10, sections: Optional[List[str]] = None) -> List[dict]:
+        """Return the best matching documents for a query, highest score first"""
+        total = len(self._docs)
+        if not total:
+            return []
+        avg_length = self._total_length / total or 1.0
+        scores: Dict[Tuple[str, object], float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            for term, boost in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if sections and doc_id[0] not in sections:
+                        continue
+                    norm = 1 - self.b + self.b * self._docs[doc_id]["length"] / avg_length
+                    scores[doc_id] += boost * idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        ranked = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)[:limit]
+        return [
+            {"section": section, "key": key, "score": round(score, 4), "item": self._docs[(section, key)]["item"]}
+            for (section, key), score in ranked
+        ]
@@ -1,28 +1,120 @@
-from fastapi import FastAPI, APIRouter
+from startup import StartupTimer
+
+# Started before the heavy imports so the report covers them
+startup_timer = StartupTimer()
+
+# Before Motor is imported, so the resource profile can size its executor
+import resources
+
+from fastapi import FastAPI, APIRouter, Depends, Query
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson.codec_options import CodecOptions
+from pymongo import UpdateOne
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List
+from typing import List, Optional
 import uuid
 from datetime import datetime, timezone
 
-# Import route modules
-from routes import contact, analytics, content, auth
-
+# Load environment before the route modules read their settings
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'portfolio_db')]
+# Import route modules. These, FastAPI and Motor/pymongo are imported eagerly:
+# every route must be registered before the first request, and pymongo is also
+# used by the SQLite store. What is deferred is the database client, created
+# on first use and warmed up in the background (see database.py).
+from routes import contact, analytics, content, auth, diagnostics
+import database
+import invalidation
+import metrics
+import slowlog
+import profiler
+import health
+import shutdown
+from database import get_db
+from responses import FastJSONResponse
+
+startup_timer.mark("imports")
+
+logger = logging.getLogger(__name__)
+
+async def warmup_database():
+    """Connect to MongoDB in the background so startup never waits on it"""
+    try:
+        startup_timer.record("db_warmup", await database.warmup())
+        # The report was stored when serving began; bring the warmup phase into it
+        app.state.startup_report = startup_timer.report()
+        logger.info(f"Database warm in {startup_timer.phases['db_warmup']}ms")
+    except Exception as e:
+        logger.warning(f"Database warmup failed, will connect on first request: {str(e)}")
+        return
+    try:
+        await prepare_status_checks(database.get_db())
+    except Exception as e:
+        logger.error(f"Status check migration failed: {str(e)}")
+
+async def prepare_status_checks(db: AsyncIOMotorDatabase, batch_size: int = 500):
+    """Index status checks for paging and convert legacy ISO string timestamps to BSON dates"""
+    await db.status_checks.create_index([("timestamp", 1), ("id", 1)])
+    migrated = skipped = 0
+    # Walk by _id so rows that cannot be converted are passed over, not read again
+    query = {"timestamp": {"$type": "string"}}
+    while True:
+        legacy = await db.status_checks.find(
+            query, {"_id": 1, "timestamp": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not legacy:
+            break
+        query = {"timestamp": {"$type": "string"}, "_id": {"$gt": legacy[-1]["_id"]}}
+        updates = []
+        for doc in legacy:
+            try:
+                timestamp = datetime.fromisoformat(doc["timestamp"])
+            except ValueError:
+                # Left as is for manual cleanup
+                logger.warning(f"Skipping status check {doc['_id']} with unparseable timestamp {doc['timestamp']!r}")
+                skipped += 1
+                continue
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"timestamp": timestamp}}))
+        if updates:
+            await db.status_checks.bulk_write(updates, ordered=False)
+        migrated += len(updates)
+    if migrated or skipped:
+        logger.info(f"Migrated {migrated} status check timestamps to BSON dates, skipped {skipped}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start serving immediately; the shared MongoDB client connects in the background"""
+    warmup = asyncio.create_task(warmup_database())
+    # Keeps per-process caches coherent when running several workers
+    cache_sync = asyncio.create_task(invalidation.run(database.get_db()))
+    loop_monitor = asyncio.create_task(metrics.monitor_event_loop())
+    contact_stats = asyncio.create_task(contact.reconcile_stats_periodically(database.get_db()))
+    slowlog.attach(asyncio.get_running_loop(), database.get_db().client)
+    # Fail readiness as soon as SIGTERM arrives, while the listeners are still open
+    shutdown.drain_on_sigterm()
+    startup_timer.ready()
+    app.state.startup_report = startup_timer.report()
+    try:
+        yield
+    finally:
+        # Finish in-flight work before the pools go away
+        app.state.shutdown_report = await shutdown.drain([warmup, cache_sync, loop_monitor, contact_stats], database.close)
 
 # Create the main app without a prefix
-app = FastAPI(title="Vagesh Anagani Portfolio API", version="1.0.0")
+app = FastAPI(
+    title="Vagesh Anagani Portfolio API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
+)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -45,37 +137,48 @@ async def root():
     return {"message": "Vagesh Anagani Portfolio API - Cybersecurity Specialist"}
 
 @api_router.post("/status", response_model=StatusCheck)
-async def create_status_check(input: StatusCheckCreate):
+async def create_status_check(input: StatusCheckCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
     
-    # Convert to dict and serialize datetime to ISO string for MongoDB
-    doc = status_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    
-    _ = await db.status_checks.insert_one(doc)
+    # Timestamps are stored as native BSON dates
+    _ = await db.status_checks.insert_one(status_obj.model_dump())
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    # Exclude MongoDB's _id field from the query results
-    status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
-    
-    # Convert ISO string timestamps back to datetime objects
-    for check in status_checks:
-        if isinstance(check['timestamp'], str):
-            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
+async def get_status_checks(
+    limit: int = Query(default=100, ge=1, le=1000),
+    after: Optional[datetime] = None,
+    after_id: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Page through status checks oldest first. Pass the last item's timestamp
+    as `after` (and its id as `after_id` to break ties) to get the next page.
+    """
+    query = {}
+    if after is not None:
+        query = {"timestamp": {"$gt": after}}
+        if after_id is not None:
+            query = {"$or": [query, {"timestamp": after, "id": {"$gt": after_id}}]}
     
-    return status_checks
+    # Decode dates as timezone-aware UTC and exclude MongoDB's _id field
+    collection = db.status_checks.with_options(codec_options=CodecOptions(tz_aware=True))
+    return await collection.find(query, {"_id": 0}).sort([("timestamp", 1), ("id", 1)]).limit(limit).to_list(limit)
 
 # Include route modules
 api_router.include_router(contact.router)
 api_router.include_router(analytics.router)
 api_router.include_router(content.router)
 api_router.include_router(auth.router)
+api_router.include_router(diagnostics.router)
 
 # Include the router in the main app
 app.include_router(api_router)
+app.add_api_route("/metrics", metrics.metrics_endpoint, include_in_schema=False)
+app.add_api_route("/health/live", health.liveness, include_in_schema=False)
+app.add_api_route("/health/ready", health.readiness, include_in_schema=False)
+startup_timer.mark("routes")
 
 app.add_middleware(
     CORSMiddleware,
@@ -84,14 +187,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Profiles requests sent with X-Profile by an authenticated admin
+app.add_middleware(
+    profiler.ProfilingMiddleware,
+    authenticate=lambda authorization: auth.authenticate(database.get_db(), authorization)
+)
+app.add_middleware(slowlog.SlowRequestMiddleware)
+# Outermost, so the recorded latency covers every other middleware
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+)
\ No newline at end of file
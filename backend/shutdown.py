@@ -0,0 +1,115 @@
+from typing import Awaitable, Callable, List, Set
+import asyncio
+import os
+import signal
+import time
+import logging
+import metrics
+from startup import StartupTimer
+
+logger = logging.getLogger(__name__)
+
+# Time the lifespan shutdown may spend waiting for requests and background work.
+# Keep it below gunicorn's graceful_timeout and the container's stop grace period,
+# which kill the worker outright.
+SHUTDOWN_GRACE_SECONDS = float(os.environ.get('SHUTDOWN_GRACE_SECONDS', '15'))
+# Time between SIGTERM and the server closing its listeners. Readiness already
+# fails, so load balancers stop routing here while requests are still served.
+# Together with the grace period it must stay below graceful_timeout.
+SHUTDOWN_DRAIN_DELAY_SECONDS = float(os.environ.get('SHUTDOWN_DRAIN_DELAY_SECONDS', '3'))
+
+# Set on SIGTERM (or when shutdown begins without one); fails the readiness check
+draining = False
+
+# Fire-and-forget work started with spawn(), awaited before the pools close
+_tasks: Set[asyncio.Task] = set()
+
+def spawn(coro: Awaitable) -> asyncio.Task:
+    """Run work in the background that shutdown waits for instead of dropping"""
+    task = asyncio.ensure_future(coro)
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+def pending_tasks() -> int:
+    return len(_tasks)
+
+def drain_on_sigterm(delay: float = SHUTDOWN_DRAIN_DELAY_SECONDS) -> bool:
+    """
+    Run ahead of the server's own SIGTERM handler: fail readiness at once, keep
+    serving for `delay` seconds, then hand over so the server stops listening and
+    runs the lifespan shutdown. Call from lifespan startup, after uvicorn (or
+    gunicorn's UvicornWorker) has installed its handler on the running loop.
+    """
+    loop = asyncio.get_running_loop()
+    # asyncio offers no public way to read a registered handler
+    previous = getattr(loop, "_signal_handlers", {}).get(signal.SIGTERM)
+    if previous is None:
+        return False
+
+    def hand_over():
+        previous._callback(*previous._args)
+
+    def on_sigterm():
+        global draining
+        if draining:
+            # A second SIGTERM skips the rest of the delay
+            hand_over()
+            return
+        draining = True
+        logger.info(f"SIGTERM received, failing readiness for {delay}s before shutting down")
+        loop.call_later(delay, hand_over)
+
+    loop.add_signal_handler(signal.SIGTERM, on_sigterm)
+    return True
+
+async def _wait_until(done: Callable[[], bool], deadline: float, interval: float = 0.01):
+    while not done() and time.perf_counter() < deadline:
+        await asyncio.sleep(interval)
+
+async def drain(services: List[asyncio.Task], close: Callable[[], None],
+                grace: float = SHUTDOWN_GRACE_SECONDS) -> dict:
+    """
+    Let in-flight requests and spawned tasks finish within the grace period,
+    stop the long-running services, then close the pools. The server has
+    stopped accepting connections by the time this runs.
+    """
+    global draining
+    draining = True
+    timer = StartupTimer()
+    deadline = timer.started + grace
+
+    # Requests already inside the app (uvicorn has usually waited for its connections by now)
+    await _wait_until(lambda: metrics.in_flight == 0, deadline)
+    abandoned_requests = metrics.in_flight
+    timer.mark("requests")
+
+    # Background writes and captures started by those requests
+    cancelled_tasks = 0
+    if _tasks:
+        _, still_running = await asyncio.wait(set(_tasks), timeout=max(0.0, deadline - time.perf_counter()))
+        for task in still_running:
+            task.cancel()
+        cancelled_tasks = len(still_running)
+    timer.mark("tasks")
+
+    for service in services:
+        service.cancel()
+    await asyncio.gather(*services, return_exceptions=True)
+    timer.mark("services")
+
+    # Waits for operations already handed to the database threads
+    close()
+    timer.mark("pools")
+
+    report = {
+        "shutdown_ms": round((time.perf_counter() - timer.started) * 1000, 1),
+        "phases_ms": dict(timer.phases),
+        "abandoned_requests": abandoned_requests,
+        "cancelled_tasks": cancelled_tasks,
+    }
+    if abandoned_requests or cancelled_tasks:
+        logger.warning(f"Shutdown grace period of {grace}s ran out: {report}")
+    else:
+        logger.info(f"Shutdown drained in {report['shutdown_ms']}ms: {report['phases_ms']}")
+    return report
@@ -0,0 +1,176 @@
+from collections import deque
+from datetime import datetime
+from pymongo import monitoring
+from typing import Optional
+import asyncio
+import threading
+import time
+import os
+import logging
+import resources
+import shutdown
+
+logger = logging.getLogger(__name__)
+
+# Requests and MongoDB commands slower than these thresholds are kept in a
+# bounded ring buffer that admins can read from /api/diagnostics/slow-log
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '500'))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+SLOW_LOG_SIZE = resources.limit('SLOW_LOG_SIZE')
+# Capture explain() plans for slow reads in the background
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct"}
+IGNORED_COMMANDS = {"explain", "hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+# deque.append is atomic, so executor threads and the event loop can share it
+entries = deque(maxlen=SLOW_LOG_SIZE)
+resources.register_usage("slow_log", lambda: entries, SLOW_LOG_SIZE)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client = None
+_pending = threading.local()
+
+def attach(loop: asyncio.AbstractEventLoop, client):
+    """Give the listener a loop and client to run explain() on"""
+    global _loop, _client
+    _loop = loop
+    _client = client
+
+def query_shape(value, depth: int = 0):
+    """Replace literal values with their type names, keeping operators and field names"""
+    if depth > 6:
+        return "..."
+    if isinstance(value, dict):
+        return {k: query_shape(v, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [query_shape(v, depth + 1) for v in value[:3]]
+    return f"<{type(value).__name__}>"
+
+def _command_filter(command: dict):
+    """The filter part of a command, wherever the command keeps it"""
+    if "filter" in command:
+        return command["filter"]
+    if "query" in command:
+        return command["query"]
+    if "pipeline" in command:
+        return [stage for stage in command["pipeline"] if "$match" in stage]
+    for key in ("updates", "deletes"):
+        if key in command:
+            return [statement.get("q") for statement in command[key]]
+    return None
+
+def _docs_returned(reply: dict) -> Optional[int]:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    if "n" in reply:
+        return reply["n"]
+    return None
+
+class SlowRequestMiddleware:
+    """ASGI middleware logging requests slower than SLOW_REQUEST_MS"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= SLOW_REQUEST_MS:
+                route = scope.get("route")
+                entry = {
+                    "kind": "request",
+                    "at": datetime.utcnow(),
+                    "method": scope["method"],
+                    "route": getattr(route, "path", "unmatched"),
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 1),
+                }
+                entries.append(entry)
+                logger.warning(f"Slow request: {entry['method']} {entry['path']} {status_code} took {entry['duration_ms']}ms")
+
+async def _capture_explain(entry: dict, database: str, command: dict):
+    """Attach the winning plan of a slow read to its log entry"""
+    explain_command = {k: v for k, v in command.items() if not k.startswith("$") and k not in ("lsid", "txnNumber")}
+    try:
+        result = await _client[database].command({"explain": explain_command, "verbosity": "queryPlanner"})
+        entry["explain"] = result.get("queryPlanner", {}).get("winningPlan", result)
+    except Exception as e:
+        entry["explain"] = {"error": str(e)}
+
+class SlowCommandListener(monitoring.CommandListener):
+    """Logs MongoDB commands slower than SLOW_QUERY_MS, with their filter shape"""
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        if not hasattr(_pending, "commands"):
+            _pending.commands = {}
+        _pending.commands[event.request_id] = (event.command, event.database_name)
+
+    def succeeded(self, event):
+        self._finish(event, event.reply)
+
+    def failed(self, event):
+        self._finish(event, None)
+
+    def _finish(self, event, reply):
+        pending = getattr(_pending, "commands", {}).pop(event.request_id, None)
+        if pending is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < SLOW_QUERY_MS:
+            return
+        command, database = pending
+        collection = command.get(event.command_name)
+        entry = {
+            "kind": "query",
+            "at": datetime.utcnow(),
+            "command": event.command_name,
+            "collection": collection if isinstance(collection, str) else None,
+            "filter": query_shape(_command_filter(command)),
+            "duration_ms": round(duration_ms, 1),
+            "docs_returned": _docs_returned(reply) if reply is not None else None,
+            "failed": reply is None,
+        }
+        entries.append(entry)
+        logger.warning(f"Slow query: {event.command_name} on {entry['collection']} took {entry['duration_ms']}ms, filter {entry['filter']}")
+
+        if SLOW_QUERY_EXPLAIN and event.command_name in EXPLAINABLE_COMMANDS and _loop is not None and _client is not None:
+            # Called from a Motor executor thread; hand the explain over to the event loop
+            source = dict(command)
+            try:
+                _loop.call_soon_threadsafe(
+                    lambda: shutdown.spawn(_capture_explain(entry, database, source))
+                )
+            except RuntimeError:
+                # Loop already closed during shutdown
+                pass
+
+def snapshot(limit: int = 100, kind: Optional[str] = None) -> list:
+    """Most recent entries first"""
+    result = []
+    for entry in reversed(list(entries)):
+        if kind and entry["kind"] != kind:
+            continue
+        result.append(entry)
+        if len(result) >= limit:
+            break
+    return result
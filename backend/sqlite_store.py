@@ -0,0 +1,923 @@
+"""
+Embedded SQLite storage with the subset of Motor's API the routes use.
+
+Selected with STORAGE_BACKEND=sqlite, so a single-node deployment can run
+without a MongoDB container. Each collection is a table holding documents as
+JSON, keyed by their _id. Filters are matched in Python against decoded
+documents; simple equality, range and $in conditions on top-level or dotted
+fields are also pushed down to SQL so that indexes created with create_index()
+(expression indexes on json_extract) narrow the rows read.
+
+Operations run on a small thread pool, each thread with its own connection in
+WAL mode, so reads never block behind the single writer. Every write is one
+IMMEDIATE transaction, which also makes find_one_and_update and $inc atomic
+across gunicorn workers sharing the file.
+
+Limitations compared to MongoDB: equality filters pushed down to SQL treat the
+field as a scalar (match array fields with a Python-only operator such as
+$elemMatch), there is no aggregate(), and no multi-document transactions.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne, UpdateMany, ReplaceOne, DeleteOne, DeleteMany
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from pymongo.results import InsertOneResult, InsertManyResult, UpdateResult, DeleteResult, BulkWriteResult
+import asyncio
+import copy
+import json
+import re
+import sqlite3
+import threading
+import time
+import logging
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Datetimes and ObjectIds are stored as tagged strings. Datetimes use a fixed
+# width UTC format so they sort and compare correctly as text in SQL.
+DATE_TAG = "\u0001D"
+OBJECT_ID_TAG = "\u0001O"
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+COLLECTION_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_.]*$")
+
+COMMAND_NAMES = {
+    "_find": "find", "_insert_one": "insert", "_insert_many": "insert",
+    "_write_update": "update", "_write_delete": "delete", "_find_one_and_update": "findAndModify",
+    "_bulk_write": "bulkWrite", "_count": "count", "_distinct": "distinct",
+    "_create_index": "createIndexes", "_drop": "drop", "_rename": "renameCollection",
+}
+
+def encode(value):
+    """Python/BSON value -> JSON-safe value"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return DATE_TAG + value.strftime(DATE_FORMAT)
+    if isinstance(value, ObjectId):
+        return OBJECT_ID_TAG + str(value)
+    if isinstance(value, dict):
+        return {str(k): encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode(v) for v in value]
+    return value
+
+def decode(value, tz_aware: bool = False):
+    """JSON value -> Python/BSON value"""
+    if isinstance(value, str) and value.startswith("\u0001"):
+        if value.startswith(DATE_TAG):
+            decoded = datetime.fromisoformat(value[len(DATE_TAG):])
+            return decoded.replace(tzinfo=timezone.utc) if tz_aware else decoded
+        if value.startswith(OBJECT_ID_TAG):
+            return ObjectId(value[len(OBJECT_ID_TAG):])
+    if isinstance(value, dict):
+        return {k: decode(v, tz_aware) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode(v, tz_aware) for v in value]
+    return value
+
+
+def _index_prefix(collection: str) -> str:
+    """SQLite index names are global, so they start with their collection's name"""
+    return re.sub(r"[^A-Za-z0-9_]", "_", collection) + "__"
+
+def _dumps(value) -> str:
+    return json.dumps(encode(value), separators=(",", ":"), ensure_ascii=False)
+
+# Filter matching (MongoDB semantics, evaluated on decoded documents)
+
+_MISSING = object()
+
+def _get(doc, path: str):
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part, _MISSING)
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return _MISSING
+    return value
+
+def _bracket(value) -> int:
+    """MongoDB's cross-type ordering, coarsely"""
+    if value is None or value is _MISSING:
+        return 0
+    if isinstance(value, bool):
+        return 5
+    if isinstance(value, (int, float)):
+        return 1
+    if isinstance(value, str):
+        return 2
+    if isinstance(value, dict):
+        return 3
+    if isinstance(value, list):
+        return 4
+    if isinstance(value, ObjectId):
+        return 6
+    if isinstance(value, datetime):
+        return 7
+    return 8
+
+def _equal(a, b) -> bool:
+    if a is _MISSING:
+        a = None
+    if _bracket(a) != _bracket(b):
+        return False
+    if isinstance(a, datetime) and isinstance(b, datetime):
+        return _naive(a) == _naive(b)
+    return a == b
+
+def _naive(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def _compare(a, b, op: str) -> bool:
+    if a is _MISSING or _bracket(a) != _bracket(b) or a is None:
+        return False
+    if isinstance(a, datetime):
+        a, b = _naive(a), _naive(b)
+    try:
+        if op == "$gt":
+            return a > b
+        if op == "$gte":
+            return a >= b
+        if op == "$lt":
+            return a < b
+        return a <= b
+    except TypeError:
+        return False
+
+TYPE_NAMES = {
+    "string": str, "date": datetime, "objectId": ObjectId, "bool": bool,
+    "object": dict, "array": list, "null": type(None),
+    "double": float, "int": int, "long": int,
+}
+
+def _matches_type(value, name) -> bool:
+    if isinstance(name, list):
+        return any(_matches_type(value, n) for n in name)
+    if name == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    expected = TYPE_NAMES.get(name)
+    if expected is None:
+        raise NotImplementedError(f"$type {name!r} is not supported by the SQLite backend")
+    if expected is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, expected)
+
+def _condition(value, condition) -> bool:
+    """Match one field value against a condition (literal or operator document)"""
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        return all(_operator(value, op, arg) for op, arg in condition.items())
+    if isinstance(value, list) and not isinstance(condition, list):
+        return any(_equal(item, condition) for item in value)
+    return _equal(value, condition)
+
+def _operator(value, op: str, arg) -> bool:
+    if op == "$eq":
+        return _condition(value, arg)
+    if op == "$ne":
+        return not _condition(value, arg)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        if isinstance(value, list):
+            return any(_compare(item, arg, op) for item in value)
+        return _compare(value, arg, op)
+    if op == "$in":
+        return any(_condition(value, item) for item in arg)
+    if op == "$nin":
+        return not any(_condition(value, item) for item in arg)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$type":
+        return value is not _MISSING and _matches_type(value, arg)
+    if op == "$not":
+        return not _condition(value, arg)
+    if op == "$regex":
+        return isinstance(value, str) and re.search(arg, value) is not None
+    if op == "$options":
+        return True
+    if op == "$elemMatch":
+        return isinstance(value, list) and any(
+            matches(item, arg) if isinstance(item, dict) else _condition(item, arg) for item in value
+        )
+    if op == "$size":
+        return isinstance(value, list) and len(value) == arg
+    raise NotImplementedError(f"{op} is not supported by the SQLite backend")
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    """Whether a decoded document matches a MongoDB filter"""
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in condition):
+                return False
+        elif key.startswith("$"):
+            raise NotImplementedError(f"{key} is not supported by the SQLite backend")
+        else:
+            if isinstance(condition, dict) and "$regex" in condition and "$options" in condition:
+                flags = re.IGNORECASE if "i" in condition["$options"] else 0
+                value = _get(doc, key)
+                if not (isinstance(value, str) and re.search(condition["$regex"], value, flags)):
+                    return False
+                continue
+            if not _condition(_get(doc, key), condition):
+                return False
+    return True
+
+# SQL pushdown: a superset of the matching rows, using the same expressions as the indexes
+
+def _field_sql(path: str) -> str:
+    json_path = "$" + "".join(f'."{part}"' for part in path.split("."))
+    return f"json_extract(doc, '{json_path}')"
+
+def _sql_param(value):
+    """A scalar value as json_extract returns it, or _MISSING when it can't be compared in SQL"""
+    if isinstance(value, (datetime, ObjectId)):
+        return encode(value)
+    if isinstance(value, (str, int, float)) or value is None:
+        return value
+    return _MISSING
+
+def _field_where(path: str, condition) -> Tuple[List[str], list]:
+    clauses, params = [], []
+    if path == "_id":
+        if isinstance(condition, dict) and set(condition) == {"$in"}:
+            clauses.append(f"_id IN ({','.join('?' * len(condition['$in']))})")
+            params.extend(_dumps(v) for v in condition["$in"])
+        elif not (isinstance(condition, dict) and any(k.startswith("$") for k in condition)):
+            clauses.append("_id = ?")
+            params.append(_dumps(condition))
+        return clauses, params
+
+    expression = _field_sql(path)
+    operators = condition if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition) else {"$eq": condition}
+    for op, arg in operators.items():
+        if op == "$eq":
+            param = _sql_param(arg)
+            if param is None:
+                clauses.append(f"{expression} IS NULL")
+            elif param is not _MISSING:
+                clauses.append(f"{expression} = ?")
+                params.append(param)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            param = _sql_param(arg)
+            if param is not _MISSING and param is not None:
+                sql_op = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}[op]
+                clauses.append(f"{expression} {sql_op} ?")
+                params.append(param)
+        elif op == "$in":
+            values = [_sql_param(v) for v in arg]
+            if values and all(v is not _MISSING for v in values):
+                present = [v for v in values if v is not None]
+                parts = [f"{expression} IN ({','.join('?' * len(present))})"] if present else []
+                if len(present) != len(values):
+                    parts.append(f"{expression} IS NULL")
+                clauses.append("(" + " OR ".join(parts) + ")")
+                params.extend(present)
+    return clauses, params
+
+def where(query: Optional[dict]) -> Tuple[str, list]:
+    """SQL condition selecting at least every row the filter matches"""
+    clauses, params = [], []
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            for sub in condition:
+                sql, sub_params = where(sub)
+                if sql != "1":
+                    clauses.append(sql)
+                    params.extend(sub_params)
+        elif key == "$or":
+            branches = [where(sub) for sub in condition]
+            if branches and all(sql != "1" for sql, _ in branches):
+                clauses.append("(" + " OR ".join(f"({sql})" for sql, _ in branches) + ")")
+                for _, sub_params in branches:
+                    params.extend(sub_params)
+        elif not key.startswith("$"):
+            field_clauses, field_params = _field_where(key, condition)
+            clauses.extend(field_clauses)
+            params.extend(field_params)
+    return (" AND ".join(clauses) or "1"), params
+
+def order_by(sort: Optional[List[Tuple[str, int]]]) -> str:
+    if not sort:
+        return "rowid"
+    terms = [f"{'_id' if field == '_id' else _field_sql(field)} {'DESC' if direction < 0 else 'ASC'}" for field, direction in sort]
+    return ", ".join(terms + ["rowid"])
+
+def _normalize_sort(key_or_list, direction=None) -> Optional[List[Tuple[str, int]]]:
+    if key_or_list is None:
+        return None
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return [(key, d) for key, d in key_or_list]
+
+# Projections and updates
+
+def _evaluate(doc: dict, expression):
+    """The few aggregation expressions the routes use in find() projections"""
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(doc, expression[1:])
+        return None if value is _MISSING else value
+    if not isinstance(expression, dict):
+        return expression
+    (op, args), = expression.items()
+    if op == "$substrCP":
+        value, start, length = (_evaluate(doc, arg) for arg in args)
+        return (value or "")[start:start + length]
+    if op == "$strLenCP":
+        return len(_evaluate(doc, args))
+    raise NotImplementedError(f"{op} is not supported by the SQLite backend")
+
+def project(doc: dict, projection) -> dict:
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and any(fields.values()):
+        result = {}
+        if include_id and "_id" in doc:
+            result["_id"] = doc["_id"]
+        for path, keep in fields.items():
+            if not keep:
+                continue
+            value = _evaluate(doc, keep) if isinstance(keep, dict) else _get(doc, path)
+            if value is _MISSING:
+                continue
+            target = result
+            parts = path.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        return result
+    result = dict(doc)
+    if not include_id:
+        result.pop("_id", None)
+    for path in fields:
+        parts = path.split(".")
+        target = result
+        for part in parts[:-1]:
+            target = target.get(part) if isinstance(target, dict) else None
+            if target is None:
+                break
+        if isinstance(target, dict):
+            target.pop(parts[-1], None)
+    return result
+
+def _set_path(doc: dict, path: str, value):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.setdefault(part, {})
+    doc[parts[-1]] = value
+
+def _unset_path(doc: dict, path: str):
+    parts = path.split(".")
+    for part in parts[:-1]:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(parts[-1], None)
+
+def apply_update(doc: dict, update, inserting: bool = False) -> dict:
+    """Apply update operators (or a replacement) to a copy of a document"""
+    if isinstance(update, list):
+        raise NotImplementedError("Pipeline updates are not supported by the SQLite backend")
+    if not any(k.startswith("$") for k in update):
+        replaced = dict(update)
+        if "_id" in doc:
+            replaced["_id"] = doc["_id"]
+        return replaced
+    doc = copy.deepcopy(doc)
+    for op, fields in update.items():
+        for path, value in fields.items():
+            current = _get(doc, path)
+            if op == "$set":
+                _set_path(doc, path, value)
+            elif op == "$setOnInsert":
+                if inserting:
+                    _set_path(doc, path, value)
+            elif op == "$unset":
+                _unset_path(doc, path)
+            elif op == "$inc":
+                _set_path(doc, path, (0 if current is _MISSING else current) + value)
+            elif op == "$max":
+                if current is _MISSING or _compare(value, current, "$gt"):
+                    _set_path(doc, path, value)
+            elif op == "$min":
+                if current is _MISSING or _compare(value, current, "$lt"):
+                    _set_path(doc, path, value)
+            elif op == "$push":
+                items = [] if current is _MISSING else list(current)
+                items.extend(value["$each"] if isinstance(value, dict) and "$each" in value else [value])
+                _set_path(doc, path, items)
+            elif op == "$addToSet":
+                items = [] if current is _MISSING else list(current)
+                for item in (value["$each"] if isinstance(value, dict) and "$each" in value else [value]):
+                    if not any(_equal(existing, item) for existing in items):
+                        items.append(item)
+                _set_path(doc, path, items)
+            elif op == "$pull":
+                if current is not _MISSING:
+                    _set_path(doc, path, [item for item in current if not _condition(item, value)])
+            elif op == "$currentDate":
+                _set_path(doc, path, datetime.utcnow())
+            else:
+                raise NotImplementedError(f"{op} is not supported by the SQLite backend")
+    return doc
+
+def _upsert_seed(query: Optional[dict]) -> dict:
+    """The equality fields of a filter, which an upsert copies into the new document"""
+    doc = {}
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            for sub in condition:
+                doc.update(_upsert_seed(sub))
+        elif not key.startswith("$"):
+            if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+                if "$eq" in condition:
+                    _set_path(doc, key, condition["$eq"])
+            else:
+                _set_path(doc, key, condition)
+    return doc
+
+# Storage
+
+class _Store:
+    """Owns the database file, the thread pool and one connection per pool thread"""
+
+    def __init__(self, path: str, max_workers: int):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqlite")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._tables = set()
+        self.ttl: Dict[str, Tuple[str, float]] = {}
+        self._last_expiry: Dict[str, float] = {}
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(self._call, fn, *args, **kwargs))
+
+    def _call(self, fn, *args, **kwargs):
+        command = COMMAND_NAMES.get(fn.__name__)
+        if command is None:
+            return fn(self.connection(), *args, **kwargs)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = fn(self.connection(), *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            # Reported under the MongoDB command names so /metrics reads the same on both backends
+            metrics.record_command(command, fn.__self__.name, time.perf_counter() - started, failed)
+
+    def ensure_table(self, conn: sqlite3.Connection, name: str):
+        if name in self._tables:
+            return
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" (_id TEXT PRIMARY KEY, doc TEXT NOT NULL)')
+        with self._lock:
+            self._tables.add(name)
+
+    def forget_table(self, name: str):
+        with self._lock:
+            self._tables.discard(name)
+        self.ttl.pop(name, None)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+class _Write:
+    """IMMEDIATE transaction: takes the write lock up front so read-modify-write is atomic"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+class SQLiteCursor:
+    """Lazy find() result supporting sort/skip/limit/to_list and async iteration"""
+
+    def __init__(self, collection: "SQLiteCollection", query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        limit = self._limit
+        if length is not None and (not limit or length < limit):
+            limit = length
+        return await self._collection._store.run(
+            self._collection._find, self._query, self._projection, self._sort, self._skip, limit
+        )
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self.to_list(None):
+            yield doc
+
+class SQLiteCollection:
+    def __init__(self, store: _Store, database: "SQLiteDatabase", name: str, tz_aware: bool = False):
+        if not COLLECTION_NAME_RE.match(name):
+            raise ValueError(f"Invalid collection name {name!r}")
+        self._store = store
+        self.database = database
+        self.name = name
+        self._tz_aware = tz_aware
+
+    def with_options(self, codec_options=None, **kwargs) -> "SQLiteCollection":
+        tz_aware = getattr(codec_options, "tz_aware", self._tz_aware)
+        return SQLiteCollection(self._store, self.database, self.name, tz_aware)
+
+    # Synchronous helpers, run on the pool
+
+    def _expire(self, conn: sqlite3.Connection):
+        """Delete documents past a TTL index's expiry, at most once a second"""
+        ttl = self._store.ttl.get(self.name)
+        if not ttl:
+            return
+        now = time.monotonic()
+        if now - self._store._last_expiry.get(self.name, 0) < 1:
+            return
+        self._store._last_expiry[self.name] = now
+        field, seconds = ttl
+        cutoff = encode(datetime.utcfromtimestamp(time.time() - seconds))
+        # A single statement, so it is atomic on its own or joins the caller's transaction
+        conn.execute(
+            f'DELETE FROM "{self.name}" WHERE {_field_sql(field)} < ? AND {_field_sql(field)} >= ?',
+            (cutoff, DATE_TAG)
+        )
+
+    def _rows(self, conn: sqlite3.Connection, query, sort=None):
+        """Decoded (rowid, document) pairs matching a filter, in sort order"""
+        self._store.ensure_table(conn, self.name)
+        self._expire(conn)
+        sql, params = where(query)
+        cursor = conn.execute(
+            f'SELECT rowid, doc FROM "{self.name}" WHERE {sql} ORDER BY {order_by(sort)}', params
+        )
+        for rowid, raw in cursor:
+            doc = decode(json.loads(raw), self._tz_aware)
+            if matches(doc, query):
+                yield rowid, doc
+
+    def _find(self, conn, query, projection, sort, skip, limit) -> List[dict]:
+        results = []
+        for _, doc in self._rows(conn, query, sort):
+            if skip:
+                skip -= 1
+                continue
+            results.append(project(doc, projection))
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def _insert(self, conn, doc: dict):
+        if "_id" not in doc:
+            doc["_id"] = ObjectId()
+        try:
+            conn.execute(f'INSERT INTO "{self.name}" (_id, doc) VALUES (?, ?)', (_dumps(doc["_id"]), _dumps(doc)))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} {e}", 11000)
+        return doc["_id"]
+
+    def _insert_one(self, conn, doc: dict):
+        self._store.ensure_table(conn, self.name)
+        with _Write(conn):
+            return self._insert(conn, doc)
+
+    def _insert_many(self, conn, docs: List[dict], ordered: bool) -> List:
+        self._store.ensure_table(conn, self.name)
+        ids, errors = [], []
+        with _Write(conn):
+            for index, doc in enumerate(docs):
+                try:
+                    ids.append(self._insert(conn, doc))
+                except DuplicateKeyError as e:
+                    errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": doc})
+                    if ordered:
+                        break
+        if errors:
+            raise BulkWriteError({"nInserted": len(ids), "nUpserted": 0, "nMatched": 0, "nModified": 0,
+                                  "nRemoved": 0, "upserted": [], "writeErrors": errors, "writeConcernErrors": []})
+        return ids
+
+    def _update(self, conn, query, update, upsert: bool, multi: bool) -> dict:
+        """Apply an update inside the caller's transaction; returns a raw update result"""
+        matched = modified = 0
+        upserted = None
+        for rowid, doc in list(self._rows(conn, query)):
+            matched += 1
+            updated = apply_update(doc, update)
+            if updated != doc:
+                try:
+                    conn.execute(f'UPDATE "{self.name}" SET doc = ? WHERE rowid = ?', (_dumps(updated), rowid))
+                except sqlite3.IntegrityError as e:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} {e}", 11000)
+                modified += 1
+            if not multi:
+                break
+        if not matched and upsert:
+            doc = apply_update(_upsert_seed(query), update, inserting=True)
+            upserted = self._insert(conn, doc)
+        raw = {"n": matched or (1 if upserted is not None else 0), "nModified": modified}
+        if upserted is not None:
+            raw["upserted"] = upserted
+        return raw
+
+    def _write_update(self, conn, query, update, upsert, multi) -> dict:
+        self._store.ensure_table(conn, self.name)
+        with _Write(conn):
+            return self._update(conn, query, update, upsert, multi)
+
+    def _delete(self, conn, query, multi: bool) -> int:
+        deleted = 0
+        for rowid, _ in list(self._rows(conn, query)):
+            conn.execute(f'DELETE FROM "{self.name}" WHERE rowid = ?', (rowid,))
+            deleted += 1
+            if not multi:
+                break
+        return deleted
+
+    def _write_delete(self, conn, query, multi) -> int:
+        self._store.ensure_table(conn, self.name)
+        with _Write(conn):
+            return self._delete(conn, query, multi)
+
+    def _find_one_and_update(self, conn, query, update, projection, sort, upsert, return_after):
+        self._store.ensure_table(conn, self.name)
+        with _Write(conn):
+            found = next(self._rows(conn, query, sort), None)
+            if found is not None:
+                rowid, doc = found
+                updated = apply_update(doc, update)
+                conn.execute(f'UPDATE "{self.name}" SET doc = ? WHERE rowid = ?', (_dumps(updated), rowid))
+                return project(updated if return_after else doc, projection)
+            if upsert:
+                doc = apply_update(_upsert_seed(query), update, inserting=True)
+                self._insert(conn, doc)
+                return project(doc, projection) if return_after else None
+        return None
+
+    def _bulk_write(self, conn, requests, ordered: bool) -> dict:
+        self._store.ensure_table(conn, self.name)
+        result = {"nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+                  "upserted": [], "writeErrors": [], "writeConcernErrors": []}
+        with _Write(conn):
+            for index, request in enumerate(requests):
+                try:
+                    if isinstance(request, InsertOne):
+                        self._insert(conn, request._doc)
+                        result["nInserted"] += 1
+                    elif isinstance(request, (UpdateOne, UpdateMany, ReplaceOne)):
+                        raw = self._update(conn, request._filter, request._doc, request._upsert,
+                                           multi=isinstance(request, UpdateMany))
+                        if "upserted" in raw:
+                            result["nUpserted"] += 1
+                            result["upserted"].append({"index": index, "_id": raw["upserted"]})
+                        else:
+                            result["nMatched"] += raw["n"]
+                            result["nModified"] += raw["nModified"]
+                    elif isinstance(request, (DeleteOne, DeleteMany)):
+                        result["nRemoved"] += self._delete(conn, request._filter, multi=isinstance(request, DeleteMany))
+                    else:
+                        raise NotImplementedError(f"{type(request).__name__} is not supported by the SQLite backend")
+                except DuplicateKeyError as e:
+                    result["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+                    if ordered:
+                        break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return result
+
+    def _create_index(self, conn, keys, unique: bool, name: Optional[str], ttl: Optional[float]) -> str:
+        self._store.ensure_table(conn, self.name)
+        keys = _normalize_sort(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        columns = ", ".join(f"{'_id' if field == '_id' else _field_sql(field)} {'DESC' if direction < 0 else 'ASC'}" for field, direction in keys)
+        index_name = _index_prefix(self.name) + re.sub(r"[^A-Za-z0-9_]", "_", name)
+        try:
+            conn.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS "{index_name}" ON "{self.name}" ({columns})')
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name} {e}", 11000)
+        if ttl is not None:
+            self._store.ttl[self.name] = (keys[0][0], float(ttl))
+        return name
+
+    def _count(self, conn, query, skip: int, limit: int) -> int:
+        self._store.ensure_table(conn, self.name)
+        if not query and not skip and not limit and self.name not in self._store.ttl:
+            return conn.execute(f'SELECT COUNT(*) FROM "{self.name}"').fetchone()[0]
+        count = sum(1 for _ in self._rows(conn, query))
+        count = max(0, count - skip)
+        return min(count, limit) if limit else count
+
+    def _distinct(self, conn, key: str, query) -> list:
+        values = []
+        for _, doc in self._rows(conn, query):
+            value = _get(doc, key)
+            for item in (value if isinstance(value, list) else [value]):
+                if item is not _MISSING and not any(_equal(item, seen) for seen in values):
+                    values.append(item)
+        return values
+
+    def _drop(self, conn):
+        conn.execute(f'DROP TABLE IF EXISTS "{self.name}"')
+        self._store.forget_table(self.name)
+
+    def _rename(self, conn, target: str, drop_target: bool):
+        old_prefix = _index_prefix(self.name)
+        with _Write(conn):
+            if drop_target:
+                conn.execute(f'DROP TABLE IF EXISTS "{target}"')
+            conn.execute(f'ALTER TABLE "{self.name}" RENAME TO "{target}"')
+            # Indexes follow the table but keep their names; rename them so that
+            # create_index() on a new collection with the old name builds its own
+            indexes = conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (target,)
+            ).fetchall()
+            for index_name, sql in indexes:
+                if index_name.startswith(old_prefix):
+                    renamed = _index_prefix(target) + index_name[len(old_prefix):]
+                    conn.execute(f'DROP INDEX "{index_name}"')
+                    conn.execute(sql.replace(f'"{index_name}"', f'"{renamed}"', 1))
+        self._store.forget_table(self.name)
+        self._store.forget_table(target)
+
+    # Motor-compatible API
+
+    def find(self, filter: Optional[dict] = None, projection=None, sort=None, skip: int = 0, limit: int = 0) -> SQLiteCursor:
+        cursor = SQLiteCursor(self, filter, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    async def find_one(self, filter: Optional[dict] = None, projection=None, sort=None) -> Optional[dict]:
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        found = await self.find(filter, projection, sort=sort).to_list(1)
+        return found[0] if found else None
+
+    async def insert_one(self, document: dict) -> InsertOneResult:
+        return InsertOneResult(await self._store.run(self._insert_one, document), True)
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True) -> InsertManyResult:
+        """One transaction for the whole batch, the fast path for analytics imports"""
+        ids = await self._store.run(self._insert_many, list(documents), ordered)
+        return InsertManyResult(ids, True)
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False) -> UpdateResult:
+        return UpdateResult(await self._store.run(self._write_update, filter, update, upsert, False), True)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False) -> UpdateResult:
+        return UpdateResult(await self._store.run(self._write_update, filter, update, upsert, True), True)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False) -> UpdateResult:
+        return UpdateResult(await self._store.run(self._write_update, filter, replacement, upsert, False), True)
+
+    async def delete_one(self, filter: dict) -> DeleteResult:
+        return DeleteResult({"n": await self._store.run(self._write_delete, filter, False)}, True)
+
+    async def delete_many(self, filter: dict) -> DeleteResult:
+        return DeleteResult({"n": await self._store.run(self._write_delete, filter, True)}, True)
+
+    async def find_one_and_update(self, filter: dict, update: dict, projection=None, sort=None,
+                                  upsert: bool = False, return_document: bool = False) -> Optional[dict]:
+        return await self._store.run(
+            self._find_one_and_update, filter, update, projection, _normalize_sort(sort), upsert, bool(return_document)
+        )
+
+    async def bulk_write(self, requests: list, ordered: bool = True, session=None) -> BulkWriteResult:
+        return BulkWriteResult(await self._store.run(self._bulk_write, list(requests), ordered), True)
+
+    async def count_documents(self, filter: dict, skip: int = 0, limit: int = 0) -> int:
+        return await self._store.run(self._count, filter, skip, limit)
+
+    async def estimated_document_count(self) -> int:
+        return await self._store.run(self._count, None, 0, 0)
+
+    async def distinct(self, key: str, filter: Optional[dict] = None) -> list:
+        return await self._store.run(self._distinct, key, filter)
+
+    async def create_index(self, keys, unique: bool = False, name: Optional[str] = None,
+                           expireAfterSeconds: Optional[float] = None, **kwargs) -> str:
+        return await self._store.run(self._create_index, keys, unique, name, expireAfterSeconds)
+
+    async def drop(self):
+        await self._store.run(self._drop)
+
+    async def rename(self, new_name: str, dropTarget: bool = False, **kwargs):
+        await self._store.run(self._rename, self.database[new_name].name, dropTarget)
+
+class SQLiteDatabase:
+    def __init__(self, client: "SQLiteClient", name: str):
+        self.client = client
+        self.name = name
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        # Collections share one file; the database name only namespaces them when several are used
+        prefix = "" if self.name == self.client.default_name else f"{self.name}."
+        return SQLiteCollection(self.client._store, self, prefix + name)
+
+    def __getattr__(self, name: str) -> SQLiteCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command, **kwargs) -> dict:
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            await self.client._store.run(lambda conn: conn.execute("SELECT 1").fetchone())
+            return {"ok": 1.0}
+        if name in ("isMaster", "ismaster", "hello"):
+            # Standalone: no replica set, so callers skip transactions
+            return {"ok": 1.0, "ismaster": True, "isWritablePrimary": True}
+        raise NotImplementedError(f"Command {name!r} is not supported by the SQLite backend")
+
+    async def list_collection_names(self) -> List[str]:
+        prefix = "" if self.name == self.client.default_name else f"{self.name}."
+        rows = await self.client._store.run(
+            lambda conn: conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        )
+        names = [name for (name,) in rows if not name.startswith("sqlite_")]
+        if prefix:
+            return [name[len(prefix):] for name in names if name.startswith(prefix)]
+        return [name for name in names if "." not in name]
+
+    async def drop_collection(self, name: str):
+        await self[name].drop()
+
+class SQLiteClient:
+    """Stands in for AsyncIOMotorClient; one client per process"""
+
+    def __init__(self, path: str, default_name: str, max_workers: int = 4):
+        self._store = _Store(path, max_workers)
+        self.default_name = default_name
+        logger.info(f"SQLite storage at {path} with {max_workers} threads")
+
+    def __getitem__(self, name: str) -> SQLiteDatabase:
+        return SQLiteDatabase(self, name)
+
+    def get_database(self, name: Optional[str] = None) -> SQLiteDatabase:
+        return self[name or self.default_name]
+
+    async def drop_database(self, name: str):
+        db = self[name]
+        for collection in await db.list_collection_names():
+            await db.drop_collection(collection)
+
+    def close(self):
+        self._store.close()
@@ -0,0 +1,33 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class StartupTimer:
+    """
+    Records how long each startup phase took, in milliseconds
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = {}
+        self.ready_ms = None
+
+    def mark(self, phase: str):
+        """Close a sequential phase that ran since the previous mark"""
+        now = time.perf_counter()
+        self.phases[phase] = round((now - self._last) * 1000, 1)
+        self._last = now
+
+    def record(self, phase: str, seconds: float):
+        """Record a phase that was timed separately (e.g. a background task)"""
+        self.phases[phase] = round(seconds * 1000, 1)
+
+    def ready(self):
+        """Mark the app as ready to serve requests"""
+        self.mark("lifespan")
+        self.ready_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        logger.info(f"Startup ready in {self.ready_ms}ms: {self.phases}")
+
+    def report(self) -> dict:
+        return {"ready_ms": self.ready_ms, "phases_ms": dict(self.phases)}
@@ -0,0 +1,56 @@
+"""
+Password hashing tests
+Hashing and verification off the event loop, including legacy hash upgrades
+"""
+import pytest
+import asyncio
+import hashlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import bcrypt
+import passwords
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestPasswords:
+    """bcrypt hashing, calibration and rehash decisions"""
+
+    def test_hash_and_verify(self):
+        """Test that new hashes use bcrypt at the calibrated cost"""
+        stored = run(passwords.hash_password("correct horse"))
+        assert stored.startswith("$2")
+        assert passwords.bcrypt_cost(stored) == passwords.rounds() >= passwords.BCRYPT_MIN_ROUNDS
+        assert run(passwords.verify_password("correct horse", stored)) == (True, False)
+        assert run(passwords.verify_password("wrong", stored)) == (False, False)
+
+    def test_legacy_sha256_needs_rehash(self):
+        """Test that legacy SHA-256 hashes still verify and are flagged for upgrade"""
+        legacy = hashlib.sha256(b"password").hexdigest()
+        assert run(passwords.verify_password("password", legacy)) == (True, True)
+        assert run(passwords.verify_password("wrong", legacy))[0] is False
+
+    def test_weaker_bcrypt_needs_rehash(self):
+        """Test that bcrypt hashes below the current cost are flagged for upgrade"""
+        weak = bcrypt.hashpw(b"password", bcrypt.gensalt(4)).decode()
+        assert run(passwords.verify_password("password", weak)) == (True, True)
+
+    def test_unknown_user_never_matches(self):
+        """Test the dummy check used for unknown users"""
+        assert run(passwords.verify_password("password", None)) == (False, False)
+
+    def test_busy_when_queue_full(self, monkeypatch):
+        """Test that password checks are refused once the queue is full"""
+        monkeypatch.setattr(passwords, "PASSWORD_HASH_QUEUE", 0)
+        monkeypatch.setattr(passwords, "_pending", passwords.PASSWORD_HASH_THREADS)
+        with pytest.raises(passwords.PasswordHashBusy):
+            run(passwords.verify_password("password", None))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -5,6 +5,9 @@ Tests for authentication, content management, and CRUD operations
 import pytest
 import requests
 import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
 BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
 
@@ -16,6 +19,36 @@ class TestHealthAndBasics:
         response = requests.get(f"{BASE_URL}/api/content/all")
         assert response.status_code == 200
         print("API is reachable")
+    
+    def test_metrics_exposed(self):
+        """Test that /metrics reports per-route latency and MongoDB commands"""
+        requests.get(f"{BASE_URL}/api/content/all")
+        response = requests.get(f"{BASE_URL}/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/content/all",status="200"}' in body
+        assert "http_requests_in_flight" in body
+        assert "event_loop_lag_seconds" in body
+        assert 'mongo_command_duration_seconds_count{command="find"' in body
+        print("Metrics endpoint verified")
+    
+    def test_liveness(self):
+        """Test the liveness probe"""
+        response = requests.get(f"{BASE_URL}/health/live")
+        assert response.status_code == 200
+        assert response.json()["status"] == "alive"
+        print("Liveness probe verified")
+    
+    def test_readiness(self):
+        """Test that the readiness probe reports each check against its limit"""
+        response = requests.get(f"{BASE_URL}/health/ready")
+        assert response.status_code == 200
+        checks = response.json()["checks"]
+        for name in ("mongo_ping_ms", "pool_checkout_wait_ms", "event_loop_lag_ms", "queue_requests_in_flight"):
+            assert checks[name]["ok"] is True
+            assert checks[name]["value"] <= checks[name]["limit"]
+        print(f"Readiness probe verified: {sorted(checks)}")
 
 
 class TestAuthentication:
@@ -86,6 +119,43 @@ class TestAuthentication:
         assert response.status_code == 401
         print("Invalid token correctly rejected")
     
+    def test_token_verification_cached(self):
+        """Test that repeated verification of a token skips the admin_users lookup"""
+        login_response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        headers = {"Authorization": f"Bearer {login_response.json()['token']}"}
+        requests.get(f"{BASE_URL}/api/auth/verify", headers=headers)
+        
+        def admin_user_finds():
+            for line in requests.get(f"{BASE_URL}/metrics").text.splitlines():
+                if line.startswith('mongo_command_duration_seconds_count{command="find",collection="admin_users"}'):
+                    return float(line.split()[-1])
+            return 0.0
+        
+        before = admin_user_finds()
+        for _ in range(5):
+            response = requests.get(f"{BASE_URL}/api/auth/verify", headers=headers)
+            assert response.status_code == 200
+        assert admin_user_finds() == before
+        print("Cached token verification skipped the database")
+    
+    def test_logout_revokes_token(self):
+        """Test that a token stops working after logout"""
+        login_response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        headers = {"Authorization": f"Bearer {login_response.json()['token']}"}
+        assert requests.get(f"{BASE_URL}/api/auth/verify", headers=headers).status_code == 200
+        
+        response = requests.post(f"{BASE_URL}/api/auth/logout", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["success"] == True
+        assert requests.get(f"{BASE_URL}/api/auth/verify", headers=headers).status_code == 401
+        print("Logged out token correctly rejected")
+    
     def test_token_verification_no_token(self):
         """Test token verification without token"""
         response = requests.get(f"{BASE_URL}/api/auth/verify")
@@ -116,6 +186,107 @@ class TestAuthentication:
         print("Wrong current password correctly rejected")
 
 
+class TestDiagnostics:
+    """Admin diagnostics endpoint tests"""
+    
+    @pytest.fixture
+    def auth_token(self):
+        """Get authentication token"""
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        return response.json()["token"]
+    
+    def test_slow_log_requires_auth(self):
+        """Test that the slow log is admin-only"""
+        response = requests.get(f"{BASE_URL}/api/diagnostics/slow-log")
+        assert response.status_code == 401
+        print("Slow log correctly requires authentication")
+    
+    def test_slow_log(self, auth_token):
+        """Test reading the slow log"""
+        response = requests.get(f"{BASE_URL}/api/diagnostics/slow-log",
+            headers={"Authorization": f"Bearer {auth_token}"})
+        assert response.status_code == 200
+        data = response.json()
+        assert "request_ms" in data["thresholds"]
+        assert "query_ms" in data["thresholds"]
+        assert isinstance(data["entries"], list)
+        assert len(data["entries"]) <= data["capacity"]
+        print(f"Slow log holds {len(data['entries'])} entries")
+    
+    def test_profiled_request(self, auth_token):
+        """Test profiling a request with the X-Profile header and downloading the result"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        response = requests.get(f"{BASE_URL}/api/content/all",
+            headers={**headers, "X-Profile": "sample"})
+        assert response.status_code == 200
+        profile_id = response.headers.get("X-Profile-Id")
+        assert profile_id
+        
+        listing = requests.get(f"{BASE_URL}/api/diagnostics/profiles", headers=headers)
+        assert listing.status_code == 200
+        assert profile_id in [p["id"] for p in listing.json()["profiles"]]
+        
+        download = requests.get(f"{BASE_URL}/api/diagnostics/profiles/{profile_id}", headers=headers)
+        assert download.status_code == 200
+        print(f"Profile {profile_id} captured ({len(download.content)} bytes)")
+    
+    def test_memory_report(self, auth_token):
+        """Test the memory report lists bounded subsystems"""
+        response = requests.get(f"{BASE_URL}/api/diagnostics/memory",
+            headers={"Authorization": f"Bearer {auth_token}"})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["profile"] in ("standard", "low")
+        assert data["rss_mb"] > 0
+        assert "slow_log" in data["subsystems"]
+        assert data["subsystems"]["slow_log"]["items"] <= data["subsystems"]["slow_log"]["limit"]
+        print(f"Memory report: {data['rss_mb']}MB RSS, profile {data['profile']}")
+    
+    def test_profile_header_ignored_without_auth(self):
+        """Test that anonymous requests are never profiled"""
+        response = requests.get(f"{BASE_URL}/api/content/all", headers={"X-Profile": "sample"})
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+        print("Anonymous X-Profile header correctly ignored")
+
+
+class TestStatus:
+    """Status check pagination tests"""
+    
+    def test_status_pagination(self):
+        """Test paging through status checks with limit and after"""
+        created = [
+            requests.post(f"{BASE_URL}/api/status", json={"client_name": f"TEST_Status{i}"}).json()
+            for i in range(3)
+        ]
+        # Take the cursor from a listed item: the store keeps millisecond precision,
+        # so the microsecond timestamp returned by POST is not a position in the list
+        window_start = datetime.fromisoformat(created[0]["timestamp"].replace("Z", "+00:00")) - timedelta(seconds=1)
+        listed = requests.get(f"{BASE_URL}/api/status", params={
+            "after": window_start.isoformat(),
+            "limit": 1000
+        }).json()
+        first = next(c for c in listed if c["id"] == created[0]["id"])
+        response = requests.get(f"{BASE_URL}/api/status", params={
+            "after": first["timestamp"],
+            "after_id": first["id"],
+            "limit": 2
+        })
+        assert response.status_code == 200
+        page = response.json()
+        assert [c["id"] for c in page] == [created[1]["id"], created[2]["id"]]
+        print("Status check pagination verified")
+    
+    def test_status_limit_bounds(self):
+        """Test that oversized pages are rejected"""
+        response = requests.get(f"{BASE_URL}/api/status", params={"limit": 5000})
+        assert response.status_code == 422
+        print("Oversized status page correctly rejected")
+
+
 class TestContentAll:
     """Test /api/content/all endpoint"""
     
@@ -147,6 +318,25 @@ class TestContentAll:
         assert len(data["projects"]) > 0
         
         print(f"All content retrieved: {len(data['skills'])} skills, {len(data['projects'])} projects")
+    
+    def test_get_selected_sections_and_fields(self):
+        """Test limiting /content/all with ?sections= and ?fields="""
+        response = requests.get(f"{BASE_URL}/api/content/all", params={
+            "sections": "personal_info,projects",
+            "fields": "personal_info.name,personal_info.title,projects.title"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data.keys()) == {"personal_info", "projects"}
+        assert set(data["personal_info"].keys()) <= {"name", "title"}
+        assert all(set(p.keys()) == {"title"} for p in data["projects"])
+        print("Section and field selection verified")
+    
+    def test_get_unknown_section(self):
+        """Test that unknown sections are rejected"""
+        response = requests.get(f"{BASE_URL}/api/content/all", params={"sections": "nope"})
+        assert response.status_code == 400
+        print("Unknown section correctly rejected")
 
 
 class TestSkillsCRUD:
@@ -351,6 +541,35 @@ class TestProjectsCRUD:
         assert project_id not in project_ids
         print("Project deletion verified")
 
+    def test_concurrent_project_ids_unique(self, auth_token):
+        """Test that concurrently created projects get distinct IDs"""
+        def create(i):
+            return requests.post(f"{BASE_URL}/api/content/projects",
+                headers={"Authorization": f"Bearer {auth_token}"},
+                json={
+                    "title": f"TEST_ConcurrentProject{i}",
+                    "description": "Concurrent insert",
+                    "category": "Testing",
+                    "duration": "2024",
+                    "technologies": [],
+                    "status": "Active",
+                    "highlights": []
+                }
+            ).json()
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(create, range(5)))
+
+        ids = [r["id"] for r in results]
+        assert all(r["success"] for r in results)
+        assert len(set(ids)) == len(ids)
+        print(f"Concurrent project IDs are unique: {ids}")
+
+        # Cleanup
+        for project_id in ids:
+            requests.delete(f"{BASE_URL}/api/content/projects/{project_id}",
+                headers={"Authorization": f"Bearer {auth_token}"})
+
 
 class TestSettings:
     """Settings endpoint tests"""
@@ -522,5 +741,336 @@ class TestCertifications:
         print("Certification deleted successfully")
 
 
+class TestBulkContent:
+    """Bulk content editing tests"""
+    
+    @pytest.fixture
+    def headers(self):
+        """Authorization header for the admin user"""
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        return {"Authorization": f"Bearer {response.json()['token']}"}
+    
+    def test_bulk_requires_auth(self):
+        """Test that bulk edits are admin-only"""
+        response = requests.post(f"{BASE_URL}/api/content/skills/bulk", json={"operations": []})
+        assert response.status_code == 401
+        print("Bulk endpoint correctly requires auth")
+    
+    def test_bulk_create_reorder_delete_skills(self, headers):
+        """Test creating, reordering and deleting skills in one bulk call each"""
+        response = requests.post(f"{BASE_URL}/api/content/skills/bulk", json={
+            "operations": [
+                {"op": "create", "data": {"category": "TEST_BulkA", "level": 10}},
+                {"op": "create", "data": {"category": "TEST_BulkB", "level": 20}},
+                {"op": "reorder", "order": ["TEST_BulkB", "TEST_BulkA"]}
+            ]
+        }, headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] == True
+        assert data["inserted"] == 2
+        assert [r["status"] for r in data["results"]] == ["ok", "ok", "ok"]
+        
+        skills = requests.get(f"{BASE_URL}/api/content/skills").json()["skills"]
+        categories = [s["category"] for s in skills]
+        assert categories[:2] == ["TEST_BulkB", "TEST_BulkA"]
+        print("Bulk create and reorder verified")
+        
+        # Delete both, plus one that does not exist
+        response = requests.post(f"{BASE_URL}/api/content/skills/bulk", json={
+            "operations": [
+                {"op": "delete", "key": "TEST_BulkA"},
+                {"op": "delete", "key": "TEST_BulkB"},
+                {"op": "delete", "key": "TEST_BulkMissing"}
+            ]
+        }, headers=headers)
+        data = response.json()
+        assert data["deleted"] == 2
+        assert data["results"][2]["status"] == "error"
+        print("Bulk delete reported per-operation results")
+    
+    def test_partial_reorder_keeps_order_unique(self, headers):
+        """Test that items left out of a reorder are numbered after the listed ones"""
+        before = [s["category"] for s in requests.get(f"{BASE_URL}/api/content/skills").json()["skills"]]
+        last = before[-1]
+        response = requests.post(f"{BASE_URL}/api/content/skills/bulk", json={
+            "operations": [{"op": "reorder", "order": [last]}]
+        }, headers=headers)
+        assert response.json()["success"] == True
+        
+        skills = requests.get(f"{BASE_URL}/api/content/skills").json()["skills"]
+        assert [s["category"] for s in skills] == [last] + before[:-1]
+        assert [s["order"] for s in skills] == list(range(len(skills)))
+        
+        # Put the original order back
+        requests.post(f"{BASE_URL}/api/content/skills/bulk", json={
+            "operations": [{"op": "reorder", "order": before}]
+        }, headers=headers)
+        print("Partial reorder keeps a unique display order")
+    
+    def test_ordered_bulk_stops_at_first_invalid_operation(self, headers):
+        """Test that ordered mode skips every operation after a failing one"""
+        response = requests.post(f"{BASE_URL}/api/content/skills/bulk", json={
+            "operations": [
+                {"op": "create", "data": {"category": "TEST_BulkOrdered", "level": 10}},
+                {"op": "update", "key": "TEST_BulkMissing", "data": {"category": "TEST_BulkMissing", "level": 1}},
+                {"op": "delete", "key": "TEST_BulkOrdered"}
+            ]
+        }, headers=headers)
+        data = response.json()
+        assert [r["status"] for r in data["results"]] == ["ok", "error", "skipped"]
+        assert data["inserted"] == 1 and data["deleted"] == 0
+        
+        requests.post(f"{BASE_URL}/api/content/skills/bulk", json={
+            "operations": [{"op": "delete", "key": "TEST_BulkOrdered"}]
+        }, headers=headers)
+        print("Ordered bulk stopped at the first invalid operation")
+    
+    def test_bulk_unknown_section(self, headers):
+        """Test bulk endpoint rejects unknown sections"""
+        response = requests.post(f"{BASE_URL}/api/content/unknown/bulk", json={"operations": []}, headers=headers)
+        assert response.status_code == 404
+        print("Unknown section correctly rejected")
+
+
+
+class TestBundle:
+    """Portfolio bundle import/export tests"""
+    
+    @pytest.fixture
+    def headers(self):
+        """Authorization header for the admin user"""
+        response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        return {"Authorization": f"Bearer {response.json()['token']}"}
+    
+    def test_bundle_endpoints_require_auth(self):
+        """Test that export, import and forced reseed are admin-only"""
+        assert requests.get(f"{BASE_URL}/api/content/export").status_code == 401
+        assert requests.post(f"{BASE_URL}/api/content/import?dry_run=true", json={"version": 1}).status_code == 401
+        assert requests.post(f"{BASE_URL}/api/content/seed?force=true").status_code == 401
+        print("Bundle endpoints correctly require auth")
+    
+    def test_export_bundle(self, headers):
+        """Test exporting the portfolio as a bundle"""
+        response = requests.get(f"{BASE_URL}/api/content/export", headers=headers)
+        assert response.status_code == 200
+        assert "attachment" in response.headers.get("content-disposition", "")
+        data = response.json()
+        assert data["version"] == 1
+        assert isinstance(data["skills"], list)
+        print(f"Bundle exported with {len(data['projects'])} projects")
+    
+    def test_dry_run_reimport_is_noop(self, headers):
+        """Test that a dry-run import of a fresh export reports no changes"""
+        bundle = requests.get(f"{BASE_URL}/api/content/export", headers=headers).json()
+        response = requests.post(f"{BASE_URL}/api/content/import?dry_run=true", json=bundle, headers=headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["dry_run"] == True
+        for name in ["skills", "projects", "certifications", "experience", "education"]:
+            section = data["diff"][name]
+            assert section["added"] == [] and section["removed"] == [] and section["changed"] == []
+            assert section["reordered"] == False
+        print("Dry-run of exported bundle reports no changes")
+    
+    def test_import_rejects_invalid_bundle(self, headers):
+        """Test that bundles failing schema validation are rejected"""
+        response = requests.post(f"{BASE_URL}/api/content/import?dry_run=true", json={
+            "version": 1,
+            "skills": [{"category": "TEST_Invalid", "level": "not-a-number"}]
+        }, headers=headers)
+        assert response.status_code == 422
+        print("Invalid bundle correctly rejected")
+
+    def test_import_rejects_duplicate_keys(self, headers):
+        """Test that a bundle with duplicate keys is refused before anything is replaced"""
+        before = requests.get(f"{BASE_URL}/api/content/export", headers=headers).json()
+        bundle = dict(before, projects=before["projects"] + before["projects"][:1], skills=[])
+        response = requests.post(f"{BASE_URL}/api/content/import", json=bundle, headers=headers)
+        assert response.status_code == 422
+        after = requests.get(f"{BASE_URL}/api/content/export", headers=headers).json()
+        assert after["projects"] == before["projects"] and after["skills"] == before["skills"]
+        print("Bundle with duplicate keys refused without changes")
+
+    def test_reimport_round_trip(self, headers):
+        """Test that importing a fresh export leaves the content unchanged"""
+        before = requests.get(f"{BASE_URL}/api/content/export", headers=headers).json()
+        response = requests.post(f"{BASE_URL}/api/content/import", json=before, headers=headers)
+        assert response.status_code == 200
+        after = requests.get(f"{BASE_URL}/api/content/export", headers=headers).json()
+        for name in ["personal_info", "skills", "projects", "certifications", "experience", "education"]:
+            assert after[name] == before[name]
+        print("Re-imported bundle round-trips")
+
+
+
+class TestSearch:
+    """Content search tests"""
+    
+    def test_search_by_prefix(self):
+        """Test that a word prefix finds matching projects"""
+        projects = requests.get(f"{BASE_URL}/api/content/projects").json()["projects"]
+        word = projects[0]["title"].split()[0]
+        response = requests.get(f"{BASE_URL}/api/content/search", params={"q": word[:4]})
+        assert response.status_code == 200
+        data = response.json()
+        assert any(r["section"] == "projects" and r["key"] == projects[0]["id"] for r in data["results"])
+        print(f"Search for '{word[:4]}' returned {len(data['results'])} results in {data['took_ms']}ms")
+    
+    def test_search_sees_new_content(self):
+        """Test that the index picks up newly added certifications"""
+        requests.post(f"{BASE_URL}/api/content/certifications", json={
+            "name": "TEST_Zyxwvut Certification", "issuer": "Test Issuer", "year": 2024
+        })
+        data = requests.get(f"{BASE_URL}/api/content/search", params={"q": "zyxwvut"}).json()
+        assert [r["key"] for r in data["results"]] == ["TEST_Zyxwvut Certification"]
+        
+        requests.delete(f"{BASE_URL}/api/content/certifications/TEST_Zyxwvut Certification")
+        data = requests.get(f"{BASE_URL}/api/content/search", params={"q": "zyxwvut"}).json()
+        assert data["results"] == []
+        print("Search index follows content changes")
+    
+    def test_search_requires_query(self):
+        """Test that an empty query is rejected"""
+        response = requests.get(f"{BASE_URL}/api/content/search", params={"q": ""})
+        assert response.status_code == 422
+        print("Empty search query correctly rejected")
+
+
+class TestContact:
+    """Contact form and inbox tests"""
+    
+    def submit(self, name: str, message: str, email: str = "test@example.com"):
+        response = requests.post(f"{BASE_URL}/api/contact", json={
+            "name": name, "email": email, "message": message, "captcha_answer": "7"
+        })
+        assert response.status_code == 200
+    
+    def own(self, email: str, archived: bool = False):
+        """This test's contacts, picked out of the newest ones by their unique email"""
+        contacts = requests.get(f"{BASE_URL}/api/contact/list",
+            params={"limit": 100, "archived": archived}).json()["contacts"]
+        return [c for c in contacts if c["email"] == email]
+    
+    def test_list_pages_with_cursor(self):
+        """Test that cursor pages follow each other without gaps or repeats"""
+        for i in range(3):
+            self.submit(f"TEST_Pager {i}", "Paging test")
+        first = requests.get(f"{BASE_URL}/api/contact/list", params={"limit": 2}).json()
+        assert len(first["contacts"]) == 2 and first["next_cursor"]
+        assert "_id" not in first["contacts"][0]
+        second = requests.get(f"{BASE_URL}/api/contact/list",
+            params={"limit": 2, "cursor": first["next_cursor"]}).json()
+        
+        ids = [c["id"] for c in first["contacts"] + second["contacts"]]
+        assert len(ids) == len(set(ids))
+        timestamps = [c["timestamp"] for c in first["contacts"] + second["contacts"]]
+        assert timestamps == sorted(timestamps, reverse=True)
+        print(f"Paged {len(ids)} contacts with a cursor")
+    
+    def test_list_summary_truncates_messages(self):
+        """Test the summary view of the inbox"""
+        self.submit("TEST_Summary", "x" * 500)
+        data = requests.get(f"{BASE_URL}/api/contact/list", params={"limit": 1, "summary": True}).json()
+        contact = data["contacts"][0]
+        assert contact["name"] == "TEST_Summary"
+        assert len(contact["message"]) == 200 and contact["message_length"] == 500
+        assert "ip_address" not in contact
+        print("Summary view truncates messages")
+    
+    def test_stats_follow_writes(self):
+        """Test that the inbox counters move with new and read messages"""
+        before = requests.get(f"{BASE_URL}/api/contact/stats").json()
+        self.submit("TEST_Counter", "Counter test")
+        after_submit = requests.get(f"{BASE_URL}/api/contact/stats").json()
+        assert after_submit["total"] == before["total"] + 1
+        assert after_submit["unread"] == before["unread"] + 1
+        
+        contact = requests.get(f"{BASE_URL}/api/contact/list", params={"limit": 1}).json()["contacts"][0]
+        requests.patch(f"{BASE_URL}/api/contact/{contact['id']}/read")
+        requests.patch(f"{BASE_URL}/api/contact/{contact['id']}/read")
+        after_read = requests.get(f"{BASE_URL}/api/contact/stats").json()
+        assert after_read["unread"] == before["unread"]
+        print(f"Inbox counters: {after_read}")
+    
+    def test_bulk_actions(self):
+        """Test marking read, archiving and deleting contacts in one call each"""
+        login_response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        headers = {"Authorization": f"Bearer {login_response.json()['token']}"}
+        email = f"bulk-{uuid.uuid4().hex}@example.com"
+        for i in range(3):
+            self.submit(f"TEST_Bulk {i}", "Bulk test", email)
+        ids = [c["id"] for c in self.own(email)]
+        assert len(ids) == 3
+        
+        def bulk(body):
+            response = requests.post(f"{BASE_URL}/api/contact/bulk", json=body, headers=headers)
+            assert response.status_code == 200
+            return response.json()["affected"]
+        
+        assert bulk({"action": "mark_read", "ids": ids[:2]}) == 2
+        assert [c["read"] for c in self.own(email)] == [True, True, False]
+        assert bulk({"action": "archive", "ids": ids}) == 3
+        assert self.own(email) == []
+        assert sorted(c["id"] for c in self.own(email, archived=True)) == sorted(ids)
+        
+        assert bulk({"action": "delete", "ids": ids}) == 3
+        assert self.own(email, archived=True) == []
+        print("Bulk contact actions verified")
+    
+    def test_bulk_filter_converts_offset_to_utc(self):
+        """Test that an older_than cutoff with a non-UTC offset is compared in UTC"""
+        login_response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        headers = {"Authorization": f"Bearer {login_response.json()['token']}"}
+        email = f"offset-{uuid.uuid4().hex}@example.com"
+        self.submit("TEST_Offset", "Offset test", email)
+        [contact] = self.own(email)
+        assert contact["read"] == False
+        
+        # One second after the message, written in US Eastern standard time
+        stored = datetime.fromisoformat(contact["timestamp"]).replace(tzinfo=timezone.utc)
+        cutoff = (stored + timedelta(seconds=1)).astimezone(timezone(timedelta(hours=-5)))
+        response = requests.post(f"{BASE_URL}/api/contact/bulk", json={
+            "action": "mark_read", "filter": {"older_than": cutoff.isoformat(), "email": email}
+        }, headers=headers)
+        assert response.status_code == 200
+        assert response.json()["affected"] == 1
+        assert [c["read"] for c in self.own(email)] == [True]
+        
+        requests.post(f"{BASE_URL}/api/contact/bulk", json={"action": "delete", "ids": [contact["id"]]}, headers=headers)
+        print(f"Cutoff {cutoff.isoformat()} matched the message stored at {contact['timestamp']}")
+    
+    def test_bulk_requires_auth_and_selection(self):
+        """Test that bulk actions need a token and an explicit selection"""
+        response = requests.post(f"{BASE_URL}/api/contact/bulk", json={"action": "delete", "filter": {}})
+        assert response.status_code == 401
+        login_response = requests.post(f"{BASE_URL}/api/auth/login", json={
+            "username": "admin",
+            "password": "password"
+        })
+        headers = {"Authorization": f"Bearer {login_response.json()['token']}"}
+        response = requests.post(f"{BASE_URL}/api/contact/bulk", json={"action": "delete", "filter": {}}, headers=headers)
+        assert response.status_code == 400
+        print("Unselective bulk delete correctly rejected")
+    
+    def test_list_rejects_bad_cursor(self):
+        """Test that a malformed cursor is a client error"""
+        response = requests.get(f"{BASE_URL}/api/contact/list", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        print("Malformed cursor correctly rejected")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,122 @@
+"""
+SQLite storage tests
+Run the embedded store directly against a temporary database file
+"""
+import pytest
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pymongo import UpdateOne, InsertOne, DeleteOne
+from pymongo.errors import DuplicateKeyError
+from sqlite_store import SQLiteClient
+
+
+@pytest.fixture
+def db(tmp_path):
+    client = SQLiteClient(str(tmp_path / "test.db"), "portfolio_test")
+    yield client["portfolio_test"]
+    client.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestSQLiteStore:
+    """Motor-compatible behaviour of the SQLite store"""
+
+    def test_insert_and_find(self, db):
+        """Test that documents round-trip with datetimes and filters"""
+        now = datetime.utcnow().replace(microsecond=0)
+
+        async def scenario():
+            await db.items.insert_many([
+                {"id": str(i), "n": i, "tags": ["a", "b"] if i % 2 else ["c"], "at": now - timedelta(days=i)}
+                for i in range(10)
+            ])
+            found = await db.items.find({"n": {"$gte": 3, "$lt": 6}}, {"_id": 0}).sort("n", -1).to_list(100)
+            recent = await db.items.count_documents({"at": {"$gte": now - timedelta(days=2)}})
+            # Equality on array fields is pushed down to SQL as a scalar comparison
+            tagged = await db.items.count_documents({"tags": {"$elemMatch": {"$eq": "a"}}})
+            either = await db.items.find({"$or": [{"id": "1"}, {"id": "8"}]}).to_list(10)
+            return found, recent, tagged, either
+
+        found, recent, tagged, either = run(scenario())
+        assert [doc["n"] for doc in found] == [5, 4, 3]
+        assert found[0]["at"] == now - timedelta(days=5)
+        assert "_id" not in found[0]
+        assert recent == 3
+        assert tagged == 5
+        assert sorted(doc["id"] for doc in either) == ["1", "8"]
+
+    def test_updates(self, db):
+        """Test update operators, upserts and find_one_and_update"""
+        async def scenario():
+            await db.counters.update_one({"_id": "visits"}, {"$inc": {"count": 1}}, upsert=True)
+            await db.counters.update_one({"_id": "visits"}, {"$inc": {"count": 2}, "$set": {"page": "/"}})
+            after = await db.counters.find_one_and_update(
+                {"_id": "visits"}, {"$push": {"log": "x"}}, return_document=True
+            )
+            result = await db.counters.update_many({}, {"$unset": {"page": ""}})
+            return after, result, await db.counters.find_one({"_id": "visits"})
+
+        after, result, doc = run(scenario())
+        assert after["count"] == 3 and after["log"] == ["x"]
+        assert result.modified_count == 1
+        assert "page" not in doc
+
+    def test_unique_index_and_bulk_write(self, db):
+        """Test unique indexes, bulk writes and deletes"""
+        async def scenario():
+            await db.users.create_index("username", unique=True)
+            await db.users.insert_one({"username": "admin"})
+            with pytest.raises(DuplicateKeyError):
+                await db.users.insert_one({"username": "admin"})
+            result = await db.users.bulk_write([
+                InsertOne({"username": "editor"}),
+                UpdateOne({"username": "admin"}, {"$set": {"role": "owner"}}),
+                DeleteOne({"username": "editor"}),
+            ])
+            return result, await db.users.distinct("username"), await db.users.find_one({"username": "admin"})
+
+        result, names, admin = run(scenario())
+        assert (result.inserted_count, result.modified_count, result.deleted_count) == (1, 1, 1)
+        assert names == ["admin"]
+        assert admin["role"] == "owner"
+
+    def test_ttl_index_expires_documents(self, db):
+        """Test that documents past a TTL index's expiry are no longer returned"""
+        async def scenario():
+            await db.sessions.create_index("created_at", expireAfterSeconds=60)
+            await db.sessions.insert_many([
+                {"id": "old", "created_at": datetime.utcnow() - timedelta(minutes=5)},
+                {"id": "new", "created_at": datetime.utcnow()},
+            ])
+            return await db.sessions.find({}).to_list(10)
+
+        assert [doc["id"] for doc in run(scenario())] == ["new"]
+
+    def test_rename_replaces_target(self, db):
+        """Test that rename with dropTarget swaps a collection in, indexes included"""
+        async def scenario():
+            await db.items.insert_one({"id": 1})
+            for attempt in range(2):
+                await db.staged.drop()
+                await db.staged.create_index("id", unique=True)
+                await db.staged.insert_many([{"id": 2}, {"id": 3}])
+                await db.staged.rename("items", dropTarget=True)
+            with pytest.raises(DuplicateKeyError):
+                await db.items.insert_one({"id": 2})
+            return await db.items.distinct("id"), await db.list_collection_names()
+
+        ids, names = run(scenario())
+        assert sorted(ids) == [2, 3]
+        assert names == ["items"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
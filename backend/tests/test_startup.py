@@ -0,0 +1,166 @@
+"""
+Cold start and shutdown tests
+Fail when importing the app and running its startup exceeds the budget, or
+when shutdown drops background work
+"""
+import pytest
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STARTUP_BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', '5'))
+
+# Imports the app and runs its lifespan startup in a fresh interpreter
+COLD_START_SCRIPT = """
+import asyncio, json
+import server
+
+async def main():
+    async with server.app.router.lifespan_context(server.app):
+        print(json.dumps(server.app.state.startup_report))
+
+asyncio.run(main())
+"""
+
+# Cold start against a throwaway SQLite file, reporting once the database warmup is done
+WARMUP_SCRIPT = """
+import asyncio, json, os, tempfile
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "startup.db")
+import server
+
+async def main():
+    async with server.app.router.lifespan_context(server.app):
+        for _ in range(500):
+            if "db_warmup" in server.app.state.startup_report["phases_ms"]:
+                break
+            await asyncio.sleep(0.01)
+        print(json.dumps(server.app.state.startup_report))
+
+asyncio.run(main())
+"""
+
+# Starts background work, then runs the lifespan shutdown and reports what it drained
+SHUTDOWN_SCRIPT = """
+import asyncio, json
+import server, shutdown
+
+finished = []
+
+async def background_write():
+    await asyncio.sleep(0.2)
+    finished.append(True)
+
+async def main():
+    async with server.app.router.lifespan_context(server.app):
+        shutdown.spawn(background_write())
+    print(json.dumps({**server.app.state.shutdown_report, "finished": len(finished)}))
+
+asyncio.run(main())
+"""
+
+# Serves the app with uvicorn, sends itself SIGTERM and probes during the drain delay
+SIGTERM_SCRIPT = """
+import asyncio, json, os, signal, socket, urllib.error, urllib.request
+os.environ["SHUTDOWN_DRAIN_DELAY_SECONDS"] = "1"
+import uvicorn, server
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+async def main():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    base = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    uv = uvicorn.Server(uvicorn.Config(server.app, log_level="warning"))
+    serving = asyncio.create_task(uv.serve(sockets=[sock]))
+    while not uv.started:
+        await asyncio.sleep(0.01)
+    _, before = await asyncio.to_thread(get, f"{base}/health/ready")
+    os.kill(os.getpid(), signal.SIGTERM)
+    await asyncio.sleep(0.2)
+    ready_status, during = await asyncio.to_thread(get, f"{base}/health/ready")
+    api_status, _ = await asyncio.to_thread(get, f"{base}/api/")
+    await serving
+    print(json.dumps({
+        "before": before["checks"]["shutting_down"]["value"],
+        "during": during["checks"]["shutting_down"]["value"],
+        "ready_status": ready_status,
+        "api_status": api_status,
+        "drained": hasattr(server.app.state, "shutdown_report"),
+    }))
+
+asyncio.run(main())
+"""
+
+
+def run_script(script: str):
+    """Run a script in a fresh interpreter without a reachable MongoDB"""
+    env = dict(os.environ)
+    # Startup must not depend on MongoDB being configured or reachable
+    env.pop("MONGO_URL", None)
+    env["MONGO_SERVER_SELECTION_TIMEOUT_MS"] = "100"
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+    elapsed = time.perf_counter() - started
+    assert result.returncode == 0, result.stderr
+    return elapsed, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestColdStart:
+    """Cold start budget tests"""
+    
+    def run_cold_start(self):
+        return run_script(COLD_START_SCRIPT)
+    
+    def test_cold_start_within_budget(self):
+        """Test that a cold start finishes within STARTUP_BUDGET_SECONDS"""
+        elapsed, report = self.run_cold_start()
+        print(f"Cold start took {elapsed:.2f}s (budget {STARTUP_BUDGET_SECONDS}s): {report}")
+        assert elapsed <= STARTUP_BUDGET_SECONDS
+    
+    def test_startup_report_phases(self):
+        """Test that the startup report breaks down every phase, including the database warmup"""
+        _, report = run_script(WARMUP_SCRIPT)
+        assert {"imports", "routes", "lifespan", "db_warmup"} <= set(report["phases_ms"])
+        assert report["ready_ms"] >= report["phases_ms"]["imports"]
+        print(f"Startup phases: {report['phases_ms']}")
+
+
+
+class TestShutdown:
+    """Graceful shutdown tests"""
+    
+    def test_shutdown_drains_background_work(self):
+        """Test that shutdown waits for spawned tasks before closing the pools"""
+        _, report = run_script(SHUTDOWN_SCRIPT)
+        print(f"Shutdown report: {report}")
+        assert report["finished"] == 1
+        assert report["cancelled_tasks"] == 0
+        assert report["abandoned_requests"] == 0
+        assert {"requests", "tasks", "services", "pools"} <= set(report["phases_ms"])
+        assert report["phases_ms"]["tasks"] >= 150
+    
+    def test_sigterm_fails_readiness_while_serving(self):
+        """Test that SIGTERM fails readiness at once and requests are served until the listeners close"""
+        _, report = run_script(SIGTERM_SCRIPT)
+        print(f"SIGTERM drain: {report}")
+        assert report["before"] == 0 and report["during"] == 1
+        assert report["ready_status"] == 503
+        assert report["api_status"] == 200
+        assert report["drained"] == True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
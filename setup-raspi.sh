@@ -147,8 +147,9 @@ echo "Option 2: Manual Start"
 echo "  Terminal 1: cd $SCRIPT_DIR/backend && source venv/bin/activate && uvicorn server:app --host 0.0.0.0 --port 8001"
 echo "  Terminal 2: cd $SCRIPT_DIR/frontend && yarn start"
 echo ""
-echo "After starting, seed the database by running:"
-echo "  curl -X POST http://localhost:8001/api/content/seed"
+echo "After starting, seed the database as admin by running:"
+echo "  TOKEN=\$(curl -s -X POST http://localhost:8001/api/auth/login -H 'Content-Type: application/json' -d '{\"username\":\"admin\",\"password\":\"password\"}' | python3 -c 'import sys,json;print(json.load(sys.stdin)[\"token\"])')"
+echo "  curl -X POST http://localhost:8001/api/content/seed -H \"Authorization: Bearer \$TOKEN\""
 echo ""
 echo "Access your portfolio at:"
 echo "  Frontend: http://localhost:3000"